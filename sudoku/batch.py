@@ -0,0 +1,92 @@
+"""Solving of many games at once, games are distributed to pool of processes"""
+import argparse
+import multiprocessing
+
+from sudoku.engine_dlx import ExactCoverEngine
+from sudoku.engine_v2 import NumberSearchEngine
+from sudoku.structures import Game
+from sudoku.task_readers import GameFileReader, TextBlockReader
+
+
+ENGINES = {
+    'v2': lambda game: NumberSearchEngine(game, propagate_singles=True),
+    'dlx': ExactCoverEngine,
+}
+
+
+class BatchResult:
+    def __init__(self, index, solved, game):
+        self.index = index
+        self.solved = solved
+        self.game = game
+
+    def __repr__(self):
+        return 'BatchResult(index={0},solved={1})'.format(self.index, self.solved)
+
+
+def iter_tasks(source, engine):
+    """
+    yields (index, engine name, game) for games from source (see solve_many),
+    game is list of input cells or text block
+    """
+    if isinstance(source, str):
+        for index, text_block in GameFileReader(source).iter_text_blocks():
+            yield index, engine, text_block
+        return
+
+    for index, game in enumerate(source, 1):
+        if isinstance(game, Game):
+            game = game.get_input_cells()
+        yield index, engine, game
+
+
+def _solve(task):
+    index, engine_name, game = task
+    if isinstance(game, str):
+        game = TextBlockReader(game).get_game()
+    engine = ENGINES[engine_name](Game(game))
+    solved = engine.find_numbers()
+    return BatchResult(index, solved, engine.game)
+
+
+def solve_many(source, engine='dlx', workers=None, chunksize=16, ordered=True):
+    """
+    solves all games from source and yields BatchResult for every game.
+    source is file name (games are read by GameFileReader) or iterable of games
+    (Game, list of cells or text block), games are indexed from 1.
+    workers is number of processes (None means cpu count, 1 solves in current process),
+    with ordered=False results are yielded as they are completed
+    """
+    if engine not in ENGINES:
+        raise ValueError('Unknown engine ({})'.format(engine))
+
+    tasks = iter_tasks(source, engine)
+    if workers == 1:
+        yield from map(_solve, tasks)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        if ordered:
+            yield from pool.imap(_solve, tasks, chunksize)
+        else:
+            yield from pool.imap_unordered(_solve, tasks, chunksize)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Solve all games in file.')
+    parser.add_argument('filename')
+    parser.add_argument('--engine', default='dlx', choices=sorted(ENGINES))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunksize', type=int, default=16)
+    parser.add_argument('--unordered', action='store_true', help='print results as they are completed')
+    options = parser.parse_args(args)
+
+    results = solve_many(options.filename, options.engine, options.workers, options.chunksize,
+                         not options.unordered)
+    for result in results:
+        solution = ''.join(result.game.compressed()) if result.solved else 'unsolved'
+        print('{}: {}'.format(result.index, solution))
+
+
+if __name__ == "__main__":
+    main()
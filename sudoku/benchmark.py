@@ -0,0 +1,223 @@
+"""Benchmark of solver engines on bundled corpora of games, report is written as JSON"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+
+from sudoku import engine
+from sudoku.batch import ENGINES as BATCH_ENGINES
+from sudoku.engine_v2 import NumberSearchEngine
+from sudoku.heuristics import BranchingStrategy, STRATEGIES
+from sudoku.structures import Game
+from sudoku.task_readers import GameFileReader
+
+
+CORPORA_DIRECTORY = os.path.join(os.path.dirname(__file__), 'corpora')
+CORPORA = ('easy', 'hard', 'minimal')
+
+ENGINES = dict(BATCH_ENGINES, v1=engine.NumberSearchEngine)
+
+
+class SolveTimeoutException(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def _time_limit(seconds):
+    """raises SolveTimeoutException after seconds, works only in main thread on unix"""
+    if not seconds or not hasattr(signal, 'setitimer') or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def handler(signum, frame):
+        raise SolveTimeoutException()
+
+    previous = signal.signal(signal.SIGALRM, handler)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def load_corpus(name):
+    """list of games (lists of input cells) from corpus file"""
+    reader = GameFileReader(os.path.join(CORPORA_DIRECTORY, name + '.txt'))
+    return [cells for _, cells in reader.iter_games()]
+
+
+def percentile(values, percent):
+    """nearest rank percentile of values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def create_solver(engine_name, game):
+    """engine by name, 'v2:<strategy>' is v2 engine with branching strategy, e.g. 'v2:degree+lcv'"""
+    name, _, strategy = engine_name.partition(':')
+    if strategy:
+        if name != 'v2':
+            raise ValueError('Only v2 engine has strategies ({})'.format(engine_name))
+        return NumberSearchEngine(game, propagate_singles=True, strategy=BranchingStrategy.from_name(strategy))
+    if name not in ENGINES:
+        raise ValueError('Unknown engine ({})'.format(engine_name))
+    return ENGINES[name](game)
+
+
+def _nodes_expanded(solver):
+    metrics = getattr(solver, 'metrics', None)
+    if metrics:
+        return metrics.nodes_expanded
+    nodes = getattr(solver, 'nodes_expanded', None)
+    if nodes is None:
+        nodes = sum(1 for _ in solver.tree.walk_through_nodes_deep_first())
+    return nodes
+
+
+def solve_one(engine_name, cells, timeout=None):
+    """returns (status, seconds, nodes expanded), status is solved, failed, timeout or error"""
+    solver = create_solver(engine_name, Game(list(cells)))
+    start = time.perf_counter()
+    try:
+        with _time_limit(timeout), open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            solved = solver.find_numbers()
+    except SolveTimeoutException:
+        return 'timeout', time.perf_counter() - start, None
+    except Exception:
+        return 'error', time.perf_counter() - start, None
+    elapsed = time.perf_counter() - start
+    solved = solved and solver.game.empty_count == 0 and solver.game.validate() == ''
+    return ('solved' if solved else 'failed'), elapsed, _nodes_expanded(solver)
+
+
+def _peak_memory(engine_name, games, timeout):
+    tracemalloc.start()
+    try:
+        for cells in games:
+            solve_one(engine_name, cells, timeout)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_corpus(engine_name, corpus, repeat=1, timeout=None, measure_memory=True):
+    games = load_corpus(corpus)
+    statuses = {'solved': 0, 'failed': 0, 'timeout': 0, 'error': 0}
+    latencies = []
+    nodes = 0
+    finished_games = []
+    for cells in games:
+        # game is finished only if no run timed out or failed with error
+        finished = True
+        for _ in range(repeat):
+            status, seconds, expanded = solve_one(engine_name, cells, timeout)
+            statuses[status] += 1
+            latencies.append(seconds)
+            nodes += expanded or 0
+            finished = finished and status in ('solved', 'failed')
+        if finished:
+            finished_games.append(cells)
+
+    total = sum(latencies)
+    result = {
+        'engine': engine_name,
+        'strategy': engine_name.partition(':')[2] or None,
+        'corpus': corpus,
+        'puzzles': len(games),
+        'repeat': repeat,
+        'solved': statuses['solved'],
+        'failed': statuses['failed'],
+        'timeouts': statuses['timeout'],
+        'errors': statuses['error'],
+        'puzzles_per_sec': len(latencies) / total if total else None,
+        'p50_ms': percentile(latencies, 50) * 1000 if latencies else None,
+        'p99_ms': percentile(latencies, 99) * 1000 if latencies else None,
+        'nodes_expanded': nodes,
+        'peak_memory_kb': None,
+    }
+    if measure_memory:
+        # separate pass, tracing of allocations slows solving down; timed out games are skipped
+        result['peak_memory_kb'] = _peak_memory(engine_name, finished_games, timeout) // 1024
+    return result
+
+
+def run_benchmark(engines=None, corpora=None, repeat=1, timeout=2.0, measure_memory=True):
+    engines = engines or sorted(ENGINES)
+    corpora = corpora or CORPORA
+    for name in engines:
+        create_solver(name, Game([]))
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timeout': timeout,
+        'results': [benchmark_corpus(name, corpus, repeat, timeout, measure_memory)
+                    for name in engines for corpus in corpora],
+    }
+
+
+def compare_with_baseline(report, baseline, tolerance=0.2):
+    """list of messages about results worse than baseline by more than tolerance (fraction)"""
+    regressions = []
+    base_results = {(r['engine'], r['corpus']): r for r in baseline['results']}
+    for result in report['results']:
+        base = base_results.get((result['engine'], result['corpus']))
+        if not base:
+            continue
+        name = '{}/{}'.format(result['engine'], result['corpus'])
+        if result['solved'] < base['solved']:
+            regressions.append('{}: solved {} < {}'.format(name, result['solved'], base['solved']))
+        if base['puzzles_per_sec'] and (result['puzzles_per_sec'] or 0) < base['puzzles_per_sec'] * (1 - tolerance):
+            regressions.append('{}: puzzles_per_sec {:.1f} < {:.1f}'.format(
+                name, result['puzzles_per_sec'] or 0, base['puzzles_per_sec']))
+        if base['p99_ms'] and result['p99_ms'] and result['p99_ms'] > base['p99_ms'] * (1 + tolerance):
+            regressions.append('{}: p99_ms {:.2f} > {:.2f}'.format(name, result['p99_ms'], base['p99_ms']))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmark solver engines on bundled corpora.')
+    parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES))
+    parser.add_argument('--strategies', nargs='+', choices=STRATEGIES,
+                        help='add v2 engine with every branching strategy')
+    parser.add_argument('--corpora', nargs='+', choices=CORPORA)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--timeout', type=float, default=2.0, help='time limit for one game in seconds')
+    parser.add_argument('--no-memory', action='store_true', help='skip measuring of peak memory')
+    parser.add_argument('--output', help='write report to file instead of stdout')
+    parser.add_argument('--baseline', help='report to compare with, regressions make exit code 1')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    options = parser.parse_args(args)
+
+    engines = options.engines
+    if options.strategies:
+        engines = (engines or []) + ['v2:' + strategy for strategy in options.strategies]
+    report = run_benchmark(engines, options.corpora, options.repeat, options.timeout,
+                           not options.no_memory)
+    text = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+
+    if options.baseline:
+        with open(options.baseline, encoding='utf-8') as file:
+            regressions = compare_with_baseline(report, json.load(file), options.tolerance)
+        for regression in regressions:
+            print('regression: ' + regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
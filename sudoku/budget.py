@@ -0,0 +1,113 @@
+"""
+Budgets of one solve (time, expanded nodes, size of search tree) with cooperative cancellation.
+Engines check budget in every step of search and stop by BudgetExhaustedException,
+solve() turns every end of search into SolveResult.
+"""
+import threading
+import time
+
+
+SOLVED = 'solved'
+UNSOLVABLE = 'unsolvable'
+BUDGET_EXHAUSTED = 'budget_exhausted'
+
+
+class BudgetExhaustedException(Exception):
+
+    def __init__(self, reason):
+        super().__init__('Budget exhausted ({})'.format(reason))
+        self.reason = reason
+
+
+class CancellationToken:
+    """
+    cancelled from other thread (or process if event is multiprocessing.Event),
+    engine stops at next step of search
+    """
+
+    def __init__(self, event=None):
+        self.event = event or threading.Event()
+
+    def cancel(self):
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+
+class Budget:
+    """
+    time_limit - seconds from start of solve, max_nodes - expanded nodes,
+    max_tree_size - nodes kept in search tree, None means no limit
+    """
+
+    def __init__(self, time_limit=None, max_nodes=None, max_tree_size=None, token=None):
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.max_tree_size = max_tree_size
+        self.token = token
+        self.deadline = None
+
+    def start(self):
+        self.deadline = time.monotonic() + self.time_limit if self.time_limit is not None else None
+
+    def check(self, nodes=0, tree_size=0):
+        """raises BudgetExhaustedException with reason cancelled, time, nodes or tree_size"""
+        if self.token and self.token.cancelled:
+            raise BudgetExhaustedException('cancelled')
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise BudgetExhaustedException('time')
+        if self.max_nodes is not None and nodes > self.max_nodes:
+            raise BudgetExhaustedException('nodes')
+        if self.max_tree_size is not None and tree_size > self.max_tree_size:
+            raise BudgetExhaustedException('tree_size')
+
+
+class SolveResult:
+    """status is SOLVED, UNSOLVABLE or BUDGET_EXHAUSTED, board is (partial) board at the end of search"""
+
+    def __init__(self, status, board, reason=None, metrics=None):
+        self.status = status
+        self.board = bytes(board)
+        self.reason = reason
+        self.metrics = metrics
+
+    def __repr__(self):
+        return 'SolveResult(status={0},reason={1})'.format(self.status, self.reason)
+
+    @property
+    def solved(self):
+        return self.status == SOLVED
+
+    def as_dict(self):
+        return {
+            'status': self.status,
+            'reason': self.reason,
+            'board': list(self.board),
+            'metrics': self.metrics,
+        }
+
+
+def solve(engine, budget=None):
+    """runs engine.find_numbers within budget, returns SolveResult"""
+    game = engine.game
+    if not game.is_valid():
+        return SolveResult(UNSOLVABLE, game.board, reason='invalid', metrics=_metrics(engine))
+    engine.budget = budget
+    if budget:
+        budget.start()
+    try:
+        solved = engine.find_numbers()
+    except BudgetExhaustedException as e:
+        return SolveResult(BUDGET_EXHAUSTED, game.board, e.reason, _metrics(engine))
+    finally:
+        engine.budget = None
+    return SolveResult(SOLVED if solved else UNSOLVABLE, game.board, metrics=_metrics(engine))
+
+
+def _metrics(engine):
+    metrics = getattr(engine, 'metrics', None)
+    if metrics:
+        return metrics.as_dict()
+    return {'nodes_expanded': engine.nodes_expanded}
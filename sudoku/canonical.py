@@ -0,0 +1,215 @@
+"""
+Canonical form of game under symmetries of sudoku - transposition, swaps of bands and stacks,
+swaps of rows in band and columns in stack and relabeling of numbers.
+Canonical form is lexicographically smallest board (rows from top, empty cell is 0) in which
+numbers are relabeled by order of first appearance.
+"""
+import collections
+import itertools
+
+from sudoku.batch import ENGINES
+
+
+MAX_STATES = 10000
+
+_PERMUTATIONS = list(itertools.permutations(range(3)))
+
+
+class TooManyStatesException(Exception):
+    pass
+
+
+class Transform:
+    """
+    maps board to canonical board, canonical cell (r, c) is cell (rows[r], cols[c])
+    of board (transposed board if transposed), numbers are replaced by labels
+    """
+
+    def __init__(self, transposed, rows, cols, labels):
+        self.transposed = transposed
+        self.rows = rows
+        self.cols = cols
+        self.labels = labels
+
+    def __repr__(self):
+        return 'Transform(transposed={0},rows={1},cols={2})'.format(self.transposed, self.rows, self.cols)
+
+    def _source_index(self, row, col):
+        if self.transposed:
+            return 9 * self.cols[col] + self.rows[row]
+        return 9 * self.rows[row] + self.cols[col]
+
+    def apply(self, board):
+        """transformed board, numbers without label (not in game) get next labels"""
+        labels = dict(self.labels)
+        result = bytearray(81)
+        for row in range(9):
+            for col in range(9):
+                num = board[self._source_index(row, col)]
+                if num:
+                    if num not in labels:
+                        labels[num] = len(labels) + 1
+                    result[9 * row + col] = labels[num]
+        return result
+
+    def invert(self, board):
+        """board transformed back, labels not in game are mapped to unused numbers in order"""
+        numbers = {label: num for num, label in self.labels.items()}
+        unused = iter(sorted(set(range(1, 10)) - set(self.labels)))
+        for label in range(1, 10):
+            if label not in numbers:
+                numbers[label] = next(unused)
+        result = bytearray(81)
+        for row in range(9):
+            for col in range(9):
+                label = board[9 * row + col]
+                if label:
+                    result[self._source_index(row, col)] = numbers[label]
+        return result
+
+
+def _next_rows(rows):
+    """rows which can follow already chosen rows - rest of current band or any row of unused band"""
+    if len(rows) % 3:
+        band = rows[-1] // 3
+        return [row for row in range(3 * band, 3 * band + 3) if row not in rows]
+    used_bands = {row // 3 for row in rows}
+    return [row for row in range(9) if row // 3 not in used_bands]
+
+
+def _first_row_orders(line):
+    """
+    orders of columns giving smallest first row - numbers in row are distinct, so it is
+    the one with empty cells first, in every stack and stacks with more empty cells first
+    """
+    stacks = []
+    for stack in range(3):
+        cols = range(3 * stack, 3 * stack + 3)
+        empty = [col for col in cols if not line[col]]
+        filled = [col for col in cols if line[col]]
+        orders = [a + b for a in itertools.permutations(empty) for b in itertools.permutations(filled)]
+        stacks.append((len(empty), orders))
+    result = []
+    for stack_order in _PERMUTATIONS:
+        empty_counts = [stacks[stack][0] for stack in stack_order]
+        if empty_counts != sorted(empty_counts, reverse=True):
+            continue
+        for parts in itertools.product(*(stacks[stack][1] for stack in stack_order)):
+            result.append(sum(parts, ()))
+    return result
+
+
+def _relabel(grid, row, cols, labels):
+    """row of grid in order of cols with numbers replaced by labels, new labels are added"""
+    line = bytearray(9)
+    for position, col in enumerate(cols):
+        num = grid[9 * row + col]
+        if num:
+            if num not in labels:
+                labels[num] = len(labels) + 1
+            line[position] = labels[num]
+    return line
+
+
+def _check_states(states, max_states):
+    # count of states is same for all equivalent boards, so limit does not break canonical form
+    if len(states) > max_states:
+        raise TooManyStatesException('More than {} partial transformations'.format(max_states))
+
+
+def canonical_form(board, max_states=MAX_STATES):
+    """
+    returns (canonical board as bytes, Transform of board to it)
+    rows are chosen one by one, only partial transformations with smallest prefix are kept,
+    boards with too many symmetric partial transformations (almost empty) raise TooManyStatesException,
+    only standard 9x9 boards are supported (ValueError)
+    """
+    board = bytes(board)
+    if len(board) != 81:
+        raise ValueError('Canonical form needs 9x9 board ({} cells)'.format(len(board)))
+    grids = (board, bytes(board[9 * col + row] for row in range(9) for col in range(9)))
+
+    best = None
+    states = []
+    for transposed, grid in enumerate(grids):
+        for row in range(9):
+            orders = _first_row_orders(grid[9 * row:9 * row + 9])
+            line = _relabel(grid, row, orders[0], {})
+            if best is None or line < best:
+                best = line
+                states = []
+            if line == best:
+                states.extend((bool(transposed), (row,), cols, {}) for cols in orders)
+    _check_states(states, max_states)
+    canonical = bytes(best)
+    for state in states:
+        _relabel(grids[state[0]], state[1][0], state[2], state[3])
+
+    for _ in range(8):
+        best = None
+        next_states = []
+        for transposed, rows, cols, labels in states:
+            grid = grids[transposed]
+            for row in _next_rows(rows):
+                row_labels = dict(labels)
+                line = _relabel(grid, row, cols, row_labels)
+                if best is None or line < best:
+                    best = line
+                    next_states = []
+                if line == best:
+                    next_states.append((transposed, rows + (row,), cols, row_labels))
+        states = next_states
+        _check_states(states, max_states)
+        canonical += best
+    transposed, rows, cols, labels = states[0]
+    return canonical, Transform(transposed, rows, cols, labels)
+
+
+class SolutionCache:
+    """
+    LRU cache of solutions by canonical form of games, equivalent games are solved only once,
+    games which are not 9x9 are solved without cache
+    """
+
+    def __init__(self, maxsize=1024, engine='dlx'):
+        if engine not in ENGINES:
+            raise ValueError('Unknown engine ({})'.format(engine))
+        self.maxsize = maxsize
+        self.engine = engine
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def solve(self, game):
+        """solved board (bytearray) of game or None if game has no solution"""
+        if game.geometry.size != 9:
+            return self._solve_uncached(game)
+        try:
+            key, transform = canonical_form(game.board)
+        except TooManyStatesException:
+            return self._solve_uncached(game)
+
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            solution = self.entries[key]
+            return transform.invert(solution) if solution is not None else None
+
+        self.misses += 1
+        solver = ENGINES[self.engine](game.copy())
+        solution = None
+        if solver.find_numbers():
+            solution = bytes(transform.apply(solver.game.board))
+        self.entries[key] = solution
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return transform.invert(solution) if solution is not None else None
+
+    def _solve_uncached(self, game):
+        self.skipped += 1
+        solver = ENGINES[self.engine](game.copy())
+        return solver.game.board if solver.find_numbers() else None
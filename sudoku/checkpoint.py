@@ -0,0 +1,131 @@
+"""
+Checkpoints of long searches of NumberSearchEngine (counting and enumeration of solutions)
+and resuming of search from last checkpoint in other process.
+
+Snapshot is gzip compressed JSON with board, trail of solution cells, open part of search
+tree (current path and alternatives not searched yet), metrics and count of found solutions.
+Fully searched subtrees are not saved (like with compact_tree), they are not searched again.
+"""
+import gzip
+import json
+import math
+import os
+import time
+
+from sudoku.engine_v2 import NumberSearchEngine
+from sudoku.metrics import SolverMetrics
+from sudoku.status_tree import Node
+from sudoku.structures import Game, Cell, get_geometry
+
+
+VERSION = 1
+
+
+class Checkpoint:
+    """
+    saves snapshot of search every interval seconds and/or every nodes expanded nodes
+    (None switches trigger off), file is replaced at once so it is never half written
+    """
+
+    def __init__(self, filename, interval=60.0, nodes=None):
+        self.filename = filename
+        self.interval = interval
+        self.nodes = nodes
+        self.saved = 0
+        self.last_time = time.monotonic()
+        self.last_nodes = 0
+
+    def step(self, engine):
+        """called by engine before every step of search"""
+        nodes_expanded = engine.metrics.nodes_expanded
+        if ((self.interval is not None and time.monotonic() - self.last_time >= self.interval) or
+                (self.nodes is not None and nodes_expanded - self.last_nodes >= self.nodes)):
+            self.save(engine)
+
+    def save(self, engine):
+        temporary = self.filename + '.tmp'
+        with gzip.open(temporary, 'wt', encoding='utf-8') as file:
+            json.dump(snapshot(engine), file, separators=(',', ':'))
+        os.replace(temporary, self.filename)
+        self.saved += 1
+        self.last_time = time.monotonic()
+        self.last_nodes = engine.metrics.nodes_expanded
+
+
+def snapshot(engine):
+    game = engine.game
+    current = engine.tree.get_current()
+    path = set()
+    node = current
+    while node:
+        path.add(id(node))
+        node = node.parent
+    return {
+        'version': VERSION,
+        'board': ''.join(game.compressed()),
+        'trail': game.trail,
+        'tree': _node_states(engine.tree.nodes, path),
+        'current': list(current.path) if current else None,
+        'exhausted': engine.exhausted,
+        'solutions': engine.solutions_found,
+        'metrics': engine.metrics.as_dict(),
+        'propagate_singles': engine.propagate_singles,
+        'compact_tree': engine.compact_tree,
+        'strategy': engine.strategy.name,
+    }
+
+
+def _node_states(nodes, path):
+    """
+    [id, done, data, children] of open nodes and nodes on current path (path - ids of objects),
+    other done nodes have fully searched subtrees
+    """
+    return [[node.id, node.done, node.data, _node_states(node.children, path)]
+            for node in nodes if not node.done or id(node) in path]
+
+
+def load(filename):
+    with gzip.open(filename, 'rt', encoding='utf-8') as file:
+        state = json.load(file)
+    if state.get('version') != VERSION:
+        raise ValueError('Unsupported version of checkpoint ({})'.format(state.get('version')))
+    return state
+
+
+def resume(filename, checkpoint=None, trace=None):
+    """
+    engine with search restored from checkpoint file, next find_numbers, count_solutions
+    or iter_solutions continues search (solutions found before are only counted)
+    """
+    state = load(filename)
+    symbols = state['board']
+    geometry = get_geometry(math.isqrt(len(symbols)))
+    board = [geometry.number(symbol) for symbol in symbols]
+    trail = state['trail']
+    inputs = list(board)
+    for index in trail:
+        inputs[index] = 0
+    game = Game.from_board(inputs, geometry)
+    for index in trail:
+        game.add_cell(Cell(geometry.cell_ids[index], board[index], geometry))
+
+    engine = NumberSearchEngine(game, state['propagate_singles'], trace, state['compact_tree'], state['strategy'])
+    for node_state in state['tree']:
+        _add_node(engine.tree, node_state, None)
+    if state['current']:
+        engine.tree.set_current(engine.tree.find_by_path(state['current']))
+    engine.exhausted = state['exhausted']
+    engine.solutions_found = state['solutions']
+    engine.metrics = SolverMetrics.from_dict(state['metrics'])
+    engine.checkpoint = checkpoint
+    engine.resumed = True
+    return engine
+
+
+def _add_node(tree, node_state, parent):
+    node_id, done, data, children = node_state
+    node = Node(node_id, done=done)
+    node.data = data
+    tree.add_node(node, parent)
+    for child_state in children:
+        _add_node(tree, child_state, node)
@@ -1,5 +1,5 @@
-from status_tree import Tree, Node
-from structures import Game, Cell
+from sudoku.status_tree import Tree, Node
+from sudoku.structures import Game, Cell
 
 
 class NumberSearchEngine:
@@ -67,7 +67,8 @@ class NumberSearchEngine:
         #print('new data:' + node_to_continue.parent.data)
         new_game.reconstruct_saved_game(node_to_continue.parent.data)
         #print('last cell after reconsruction:' + str(new_game.cells[len(new_game.cells)-1]))
-        new_game.add_cell(Cell(node_to_continue.id[:2], int(node_to_continue.id[3])))
+        ident, num = node_to_continue.id.split('=')
+        new_game.add_cell(Cell(ident, int(num)))
         #print('last cell after add_cell:' + str(new_game.cells[len(new_game.cells) - 1]))
         self.game = new_game
 
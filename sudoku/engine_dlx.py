@@ -0,0 +1,209 @@
+"""Sudoku solved as exact cover problem by dancing links (Knuth's Algorithm X)"""
+from sudoku.budget import solve as solve_within_budget
+from sudoku.structures import Cell, STANDARD
+
+
+def row_constraints(index, num, geometry=STANDARD):
+    """
+    constraint columns (0..4 * cell count - 1) covered by number num (1..size) in cell on board index,
+    blocks of columns are cells, numbers in rows, in columns and in squares
+    """
+    size, count = geometry.size, geometry.cell_count
+    return (index,
+            count + size * geometry.row_of[index] + num - 1,
+            2 * count + size * geometry.col_of[index] + num - 1,
+            3 * count + size * geometry.square_of[index] + num - 1)
+
+
+class DancingLinks:
+    """
+    toroidal doubly linked lists kept in flat arrays, node 0 is root,
+    nodes 1..column_count are column headers
+    """
+
+    def __init__(self, column_count):
+        count = column_count + 1
+        self.left = [i - 1 for i in range(count)]
+        self.left[0] = column_count
+        self.right = [i + 1 for i in range(count)]
+        self.right[column_count] = 0
+        self.up = list(range(count))
+        self.down = list(range(count))
+        self.column = list(range(count))
+        self.row_id = [None] * count
+        self.size = [0] * count
+        self.rows = {}
+        self.solution = []
+        self.nodes_expanded = 0
+        # budget.Budget checked in every node
+        self.budget = None
+
+    def add_row(self, row_id, columns):
+        """columns are numbered from 0"""
+        first = None
+        for col in columns:
+            header = col + 1
+            node = len(self.column)
+            self.column.append(header)
+            self.row_id.append(row_id)
+            self.up.append(self.up[header])
+            self.down.append(header)
+            self.down[self.up[header]] = node
+            self.up[header] = node
+            self.size[header] += 1
+            if first is None:
+                first = node
+                self.left.append(node)
+                self.right.append(node)
+            else:
+                self.left.append(self.left[first])
+                self.right.append(first)
+                self.right[self.left[first]] = node
+                self.left[first] = node
+        self.rows[row_id] = first
+
+    def cover(self, header):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, header):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def is_covered(self, header):
+        return self.right[self.left[header]] != header
+
+    def select(self, row_id):
+        """
+        puts row into solution before search (given numbers),
+        returns False if row collides with already selected rows
+        """
+        first = self.rows[row_id]
+        node = first
+        while True:
+            if self.is_covered(self.column[node]):
+                return False
+            node = self.right[node]
+            if node == first:
+                break
+        while True:
+            self.cover(self.column[node])
+            node = self.right[node]
+            if node == first:
+                break
+        return True
+
+    def search(self):
+        """generator of solutions, every solution is list of row ids chosen by search"""
+        right, down, size = self.right, self.down, self.size
+        self.nodes_expanded += 1
+        if self.budget:
+            self.budget.check(self.nodes_expanded)
+        if right[0] == 0:
+            yield list(self.solution)
+            return
+
+        header = right[0]
+        best = header
+        while header != 0:
+            if size[header] < size[best]:
+                best = header
+                if size[best] < 2:
+                    break
+            header = right[header]
+        if size[best] == 0:
+            return
+
+        self.cover(best)
+        r = down[best]
+        while r != best:
+            self.solution.append(self.row_id[r])
+            j = right[r]
+            while j != r:
+                self.cover(self.column[j])
+                j = right[j]
+            yield from self.search()
+            j = self.left[r]
+            while j != r:
+                self.uncover(self.column[j])
+                j = self.left[j]
+            self.solution.pop()
+            r = down[r]
+        self.uncover(best)
+
+
+class ExactCoverEngine:
+    """
+    solves game as exact cover with 4 * cell count constraint columns and cell count * size rows
+    (row id = size * board index + number - 1), 324 columns and 729 rows for 9x9 board
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.nodes_expanded = 0
+        self.budget = None
+
+    def _create_links(self):
+        geometry = self.game.geometry
+        size = geometry.size
+        links = DancingLinks(4 * geometry.cell_count)
+        for index in range(geometry.cell_count):
+            for num in range(1, size + 1):
+                links.add_row(size * index + num - 1, row_constraints(index, num, geometry))
+        for index, num in enumerate(self.game.board):
+            if num and not links.select(size * index + num - 1):
+                return None
+        links.budget = self.budget
+        return links
+
+    def iter_solutions(self):
+        """generator of solutions, every solution is list of cells missing in game"""
+        links = self._create_links()
+        if links is None:
+            return
+        geometry = self.game.geometry
+        size = geometry.size
+        for rows in links.search():
+            self.nodes_expanded = links.nodes_expanded
+            yield [Cell(geometry.cell_ids[row // size], row % size + 1, geometry) for row in rows]
+        self.nodes_expanded = links.nodes_expanded
+
+    def count_solutions(self, limit=2):
+        count = 0
+        for _ in self.iter_solutions():
+            count += 1
+            if count >= limit:
+                break
+        return count
+
+    def solve(self, budget=None):
+        """find_numbers within budget (budget.Budget), returns budget.SolveResult"""
+        return solve_within_budget(self, budget)
+
+    def find_numbers(self):
+        """fills game by first found solution, returns False if game has no solution"""
+        for cells in self.iter_solutions():
+            for cell in cells:
+                self.game.add_cell(cell)
+            return True
+        return False
@@ -0,0 +1,172 @@
+"""
+Propagation of singles on many games at once with numpy (optional dependency).
+Boards of games are kept in (N, 81) int8 array and candidates in (N, 81) uint16 bit masks,
+naked and hidden singles are placed into all games by vectorized reductions over rows,
+columns and squares, only games which need branching are solved one by one by engine.
+"""
+import argparse
+
+import numpy as np
+
+from sudoku.batch import ENGINES, BatchResult, iter_tasks
+from sudoku.structures import (Game, Cell, CELL_IDS, ROW_OF, COL_OF, SQUARE_OF, UNITS, ALL_NUMBERS_MASK)
+from sudoku.task_readers import TextBlockReader
+
+
+_ROW_OF = np.array(ROW_OF)
+_COL_OF = np.array(COL_OF)
+_SQUARE_OF = np.array(SQUARE_OF)
+_UNITS = np.array(UNITS)
+_NUMBERS = np.arange(1, 10, dtype=np.int8)
+_NUMBER_BITS = np.array([0] + [1 << num for num in range(1, 10)], dtype=np.uint16)
+# number by its bit, other masks are 0
+_BIT_NUMBERS = np.zeros(ALL_NUMBERS_MASK + 1, dtype=np.int8)
+_BIT_NUMBERS[_NUMBER_BITS[1:]] = _NUMBERS
+
+OPEN = 0
+SOLVED = 1
+CONTRADICTION = -1
+
+
+def used_masks(boards):
+    """(N, 27) masks of numbers used in rows, columns and squares of boards (N, 81)"""
+    bits = _NUMBER_BITS[boards].reshape(-1, 9, 9)
+    rows = np.bitwise_or.reduce(bits, axis=2)
+    cols = np.bitwise_or.reduce(bits, axis=1)
+    squares = np.bitwise_or.reduce(bits.reshape(-1, 3, 3, 3, 3), axis=(2, 4)).reshape(-1, 9)
+    return np.concatenate((rows, cols, squares), axis=1)
+
+
+def candidate_masks(boards, used=None):
+    """(N, 81) masks of numbers which can be placed into cells, filled cells have 0"""
+    if used is None:
+        used = used_masks(boards)
+    cell_used = used[:, _ROW_OF] | used[:, 9 + _COL_OF] | used[:, 18 + _SQUARE_OF]
+    return np.where(boards == 0, ALL_NUMBERS_MASK & ~cell_used, 0).astype(np.uint16)
+
+
+def _propagation_step(boards):
+    """
+    places all naked and hidden singles into boards (in place),
+    returns (changed, contradiction) bool arrays (N,)
+    """
+    used = used_masks(boards)
+    masks = candidate_masks(boards, used)
+    empty = boards == 0
+
+    # number is in unit (N, 27, 9 numbers) and count of cells where number can be placed
+    placed = ((used[:, :, None] >> _NUMBERS.astype(np.uint16)) & 1).astype(bool)
+    possible = ((masks[:, :, None] >> _NUMBERS.astype(np.uint16)) & 1).astype(bool)[:, _UNITS]
+    counts = possible.sum(axis=2)
+    contradiction = (empty & (masks == 0)).any(axis=1) | ((counts == 0) & ~placed).any(axis=(1, 2))
+
+    naked = empty & (masks != 0) & ((masks & (masks - 1)) == 0)
+    boards[naked] = _BIT_NUMBERS[masks[naked]]
+
+    games, units, numbers = np.nonzero((counts == 1) & ~placed)
+    positions = possible[games, units, :, numbers].argmax(axis=1)
+    boards[games, _UNITS[units, positions]] = _NUMBERS[numbers]
+
+    changed = naked.any(axis=1)
+    changed[games] = True
+    # singles found at once can place same number twice into unit
+    duplicates = (boards[:, :, None] == _NUMBERS)[:, _UNITS].sum(axis=2) > 1
+    contradiction |= duplicates.any(axis=(1, 2))
+    return changed & ~contradiction, contradiction
+
+
+def propagate_boards(boards):
+    """
+    places singles into boards (N, 81) until nothing changes, returns (status array, rounds),
+    status is SOLVED, CONTRADICTION or OPEN (game needs branching)
+    """
+    status = np.full(len(boards), OPEN, dtype=np.int8)
+    active = np.arange(len(boards))
+    rounds = 0
+    while len(active):
+        rounds += 1
+        subset = boards[active]
+        changed, contradiction = _propagation_step(subset)
+        boards[active] = subset
+        status[active[contradiction]] = CONTRADICTION
+        active = active[changed]
+    status[(status == OPEN) & (boards != 0).all(axis=1)] = SOLVED
+    return status, rounds
+
+
+class NumpyBatchEngine:
+    """
+    solves list of games, games are changed in place like by other engines,
+    engine - name of engine in batch.ENGINES for games which need branching
+    """
+
+    def __init__(self, games, engine='dlx'):
+        if engine not in ENGINES:
+            raise ValueError('Unknown engine ({})'.format(engine))
+        self.games = list(games)
+        self.engine = engine
+        self.rounds = 0
+        self.handed_off = 0
+
+    def find_numbers(self):
+        """returns list of bools - game was solved"""
+        if not self.games:
+            return []
+        boards = np.array([game.board for game in self.games], dtype=np.int8)
+        status, self.rounds = propagate_boards(boards)
+
+        solved = []
+        for game, board, game_status in zip(self.games, boards, status):
+            if game_status == CONTRADICTION:
+                solved.append(False)
+                continue
+            for index in np.flatnonzero(board != np.asarray(game.board)):
+                game.add_cell(Cell(CELL_IDS[index], int(board[index])))
+            if game_status == SOLVED:
+                solved.append(True)
+            else:
+                self.handed_off += 1
+                solved.append(bool(ENGINES[self.engine](game).find_numbers()))
+        return solved
+
+
+def solve_batch(source, engine='dlx', batch_size=4096):
+    """
+    solves games from source (as in batch.solve_many) in batches of batch_size games,
+    yields BatchResult for every game in order
+    """
+    batch = []
+    for task in iter_tasks(source, engine):
+        batch.append(task)
+        if len(batch) == batch_size:
+            yield from _solve_batch(batch, engine)
+            batch = []
+    if batch:
+        yield from _solve_batch(batch, engine)
+
+
+def _solve_batch(tasks, engine):
+    games = []
+    for _, _, game in tasks:
+        if isinstance(game, str):
+            game = TextBlockReader(game).get_game()
+        games.append(Game(game))
+    solved = NumpyBatchEngine(games, engine).find_numbers()
+    for (index, _, _), game, game_solved in zip(tasks, games, solved):
+        yield BatchResult(index, game_solved, game)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Solve all games in file with numpy propagation.')
+    parser.add_argument('filename')
+    parser.add_argument('--engine', default='dlx', choices=sorted(ENGINES), help='engine for branching')
+    parser.add_argument('--batch-size', type=int, default=4096)
+    options = parser.parse_args(args)
+
+    for result in solve_batch(options.filename, options.engine, options.batch_size):
+        solution = ''.join(result.game.compressed()) if result.solved else 'unsolved'
+        print('{}: {}'.format(result.index, solution))
+
+
+if __name__ == "__main__":
+    main()
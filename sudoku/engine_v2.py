@@ -1,87 +1,258 @@
+from sudoku.budget import solve as solve_within_budget
+from sudoku.heuristics import BranchingStrategy
+from sudoku.metrics import SolverMetrics
 from sudoku.status_tree import Tree, Node
-from sudoku.structures import Game, Cell
+from sudoku.structures import Cell, mask_to_numbers, count_numbers
 
 
 class NumberSearchEngine:
 
-    def __init__(self, game):
+    def __init__(self, game, propagate_singles=False, trace=None, compact_tree=False, strategy=None,
+                 checkpoint=None):
         self.game_archive = []
         self.game = game
         self.tree = Tree()
+        # fill naked and hidden singles before every branching
+        self.propagate_singles = propagate_singles
+        self.metrics = SolverMetrics()
+        # optional trace.TraceWriter recording decisions, propagations and backtracks
+        self.trace = trace
+        # True when there is no node to continue with after dead end
+        self.exhausted = False
+        # remove fully searched subtrees, tree keeps only current path and open alternatives
+        self.compact_tree = compact_tree
+        # heuristics.BranchingStrategy or its name ('degree+lcv'), default is first cell and smallest value
+        if not isinstance(strategy, BranchingStrategy):
+            strategy = BranchingStrategy.from_name(strategy) if strategy else BranchingStrategy()
+        self.strategy = strategy
+        self.metrics.strategy = strategy.name
+        # budget.Budget checked in every step, set by solve()
+        self.budget = None
+        # optional checkpoint.Checkpoint saving snapshots of search
+        self.checkpoint = checkpoint
+        # solutions found by _iter_solved (count_solutions, iter_solutions)
+        self.solutions_found = 0
+        # search restored by checkpoint.resume is continued instead of started again
+        self.resumed = False
 
-    def find_numbers(self, if_fail_create_new_plan=True):
+    def _start_search(self):
+        if self.resumed:
+            self.resumed = False
+            return
         self.tree = Tree()
-        while self.game.empty_count > 0:
-            ok = self.make_step(if_fail_create_new_plan)
-            if not ok and not if_fail_create_new_plan:
-                return False
+        self.solutions_found = 0
+        self.metrics = SolverMetrics()
+        self.metrics.strategy = self.strategy.name
+        self.exhausted = False
+        if self.trace:
+            self.trace.start(self.game)
 
-        return True
+    def find_numbers(self, if_fail_create_new_plan=True):
+        self._start_search()
+        with self.metrics.phase('total'):
+            solved = True
+            while self.game.empty_count > 0:
+                ok = self.make_step(if_fail_create_new_plan)
+                if not ok and (not if_fail_create_new_plan or self.exhausted):
+                    solved = False
+                    break
+
+        if self.trace:
+            self.trace.end(solved)
+        return solved
+
+    def solve(self, budget=None):
+        """find_numbers within budget (budget.Budget), returns budget.SolveResult"""
+        return solve_within_budget(self, budget)
+
+    def _iter_solved(self):
+        """searches whole tree, yields (nothing) every time when game is solved"""
+        self._start_search()
+        while not self.exhausted:
+            if self.game.empty_count == 0:
+                self.solutions_found += 1
+                yield
+                self.exhausted = not self.create_new_game_plan_to_continue()
+            else:
+                self.make_step()
+
+    def iter_solutions(self):
+        """lazy generator of all solutions (copies of solved game)"""
+        with self.metrics.phase('total'):
+            for _ in self._iter_solved():
+                yield self.game.copy()
+
+    def count_solutions(self, limit=2):
+        """counts solutions, search is stopped when limit is reached"""
+        for _ in self._iter_solved():
+            if self.solutions_found >= limit:
+                break
+        return self.solutions_found
 
     def save_game_current_status(self):
+        # node remembers how many solution cells the game had, backtracking undoes the rest
         current = self.tree.get_current()
         if current:
-            if not current.data:
-                current.data = self.game.get_formatted_solution_cells()
+            if current.data is None:
+                current.data = len(self.game.trail)
 
     def find_next_number(self):
         try:
-            #print(self.game.get_formatted_solution_cells() + '\n')
-            found_cells = self._find_empty_cells_with_smallest_choice()
+            with self.metrics.phase('branching'):
+                found_cells = self._find_empty_cells_with_smallest_choice()
         except EmptyCellsWithNoChoicesException:
             return False
 
         if len(found_cells) > 0:
-            c = found_cells[0]
+            c = self.strategy.choose(self.game, found_cells)
             c.cell.num = c.choices[0]
             current_node = self.tree.get_current()
             new_current_node_id = c.cell.id + "=" + str(c.cell.num)
-            self.add_to_tree(found_cells, new_current_node_id, current_node.id if current_node else None)
-            self.tree.set_current(new_current_node_id)
-            print('new current node:{}'.format(self.tree.get_current()))
+            # only choices of one cell are alternatives, other cells are solved in every branch
+            new_current_node = self.add_to_tree([c], new_current_node_id, current_node)
+            self.tree.set_current(new_current_node)
+            if self.trace:
+                children = current_node.children if current_node else self.tree.nodes
+                self.trace.decision(current_node, children, new_current_node)
+            self.metrics.node_expanded(new_current_node.depth)
             return True
         else:
             return False
 
     def make_step(self, if_fail_create_new_plan=True):
+        if self.budget:
+            self.budget.check(self.metrics.nodes_expanded, self.tree.size)
+        if self.checkpoint:
+            self.checkpoint.step(self)
+        ok = True
+        if self.propagate_singles:
+            trail_length = len(self.game.trail)
+            try:
+                with self.metrics.phase('propagation'):
+                    self.propagate()
+            except EmptyCellsWithNoChoicesException:
+                ok = False
+            if self.trace and len(self.game.trail) > trail_length:
+                self.trace.propagation(self.game.cells[trail_length - len(self.game.trail):])
         self.save_game_current_status()
-        ok = self.find_next_number()
-        if ok:
-            current_node = self.tree.get_current()
-            self.game.add_cell(Cell(current_node.id[:2], int(current_node.id[3])))
-        else:
-            print('chybi:' + str(self.game.empty_count) + '\n')
-            print('game:' + self.game.get_formatted_solution_cells())
-            self.game_archive.append(self.game)
+        if ok and self.game.empty_count > 0:
+            ok = self.find_next_number()
+            if ok:
+                self.game.add_cell(self._node_cell(self.tree.get_current()))
+        if not ok:
             if if_fail_create_new_plan:
-                self.create_new_game_plan_to_continue()
+                with self.metrics.phase('backtracking'):
+                    self.exhausted = not self.create_new_game_plan_to_continue()
+            else:
+                self.game_archive.append(self.game)
         return ok
 
+    def propagate(self):
+        """
+        fills naked singles (cell with one choice) and hidden singles (number with one
+        place in row, column or square) until nothing changes, returns count of filled cells
+        """
+        placed = 0
+        while True:
+            count = self._fill_naked_singles() or self._fill_hidden_singles()
+            if not count:
+                break
+            placed += count
+        self.metrics.propagations += placed
+        return placed
+
+    def _node_cell(self, node):
+        """cell of node id 'a1=5'"""
+        ident, num = node.id.split('=')
+        return Cell(ident, int(num), self.game.geometry)
+
+    def _fill_naked_singles(self):
+        geometry = self.game.geometry
+        placed = 0
+        empty_indexes = self.game.empty_indexes()
+        self.metrics.candidate_computations += len(empty_indexes)
+        for index in empty_indexes:
+            mask = self.game.candidates_mask_at(index)
+            if not mask:
+                raise EmptyCellsWithNoChoicesException('Cell {} is unsolvable'.format(geometry.cell_ids[index]))
+            if not mask & (mask - 1):
+                self.game.add_cell(Cell(geometry.cell_ids[index], mask.bit_length() - 1, geometry))
+                placed += 1
+        return placed
+
+    def _fill_hidden_singles(self):
+        geometry = self.game.geometry
+        cell_ids = geometry.cell_ids
+        placed = 0
+        board = self.game.board
+        for unit in geometry.units:
+            used = once = more = 0
+            for index in unit:
+                if board[index]:
+                    used |= 1 << board[index]
+                else:
+                    mask = self.game.candidates_mask_at(index)
+                    more |= once & mask
+                    once |= mask
+            missing = geometry.all_numbers_mask & ~used
+            if missing & ~once:
+                raise EmptyCellsWithNoChoicesException('Numbers {} have no place in unit {}'.format(
+                    mask_to_numbers(missing & ~once), [cell_ids[index] for index in unit]))
+            for num in mask_to_numbers(once & ~more):
+                bit = 1 << num
+                index = next((index for index in unit if not board[index] and
+                              self.game.candidates_mask_at(index) & bit), None)
+                if index is None:
+                    raise EmptyCellsWithNoChoicesException('Number {} has no place in unit {}'.format(
+                        num, [cell_ids[index] for index in unit]))
+                self.game.add_cell(Cell(cell_ids[index], num, geometry))
+                placed += 1
+        return placed
+
     def create_new_game_plan_to_continue(self):
+        """
+        backtracks to nearest not done node, returns False if there is no such node
+        (whole tree is searched)
+        """
         current_node = self.tree.get_current()
+        if not current_node:
+            return False
         current_node.done = True
-        print('find nearest for:{}'.format(current_node) + ',done=' + str(current_node.done) + '\n')
         node_to_continue = self.tree.find_nearest_not_done_node(current_node, current_node.id)
-        self.print_tree()
-        new_game = Game(self.game.get_input_cells())
-        new_game.reconstruct_saved_game(node_to_continue.parent.data)
-        new_game.add_cell(Cell(node_to_continue.id[:2], int(node_to_continue.id[3])))
-        self.tree.set_current(node_to_continue.id)
-        node_to_continue = self.tree.get_current()
-        print('new current node:{}'.format(node_to_continue) + ',done=' + str(node_to_continue.done) + '\n')
-        #current_node = self.tree.get_current()
-        #print('new current node:{}'.format(current_node))
-        self.game = new_game
-
-    def add_to_tree(self, found_cells, selected, parent_id=None):
+        if not node_to_continue:
+            return False
+        parent = node_to_continue.parent
+        if self.compact_tree:
+            self._remove_searched_subtree(current_node, parent)
+        self.game.undo(parent.data if parent else 0)
+        self.game.add_cell(self._node_cell(node_to_continue))
+        self.tree.set_current(node_to_continue)
+        if self.trace:
+            self.trace.backtrack(node_to_continue)
+        self.metrics.backtracks += 1
+        self.metrics.node_expanded(node_to_continue.depth)
+        return True
+
+    def _remove_searched_subtree(self, node, parent):
+        """removes subtree of brother of node to continue (under parent), all its nodes are done"""
+        while node.parent is not parent:
+            node = node.parent
+        self.tree.remove_node(node)
+
+    def add_to_tree(self, found_cells, selected, parent=None):
+        """adds choices as children of parent node, returns node of selected choice"""
+        selected_node = None
         for found_cell in found_cells:
             for choice in found_cell.choices:
                 id = found_cell.cell.id + '=' + str(choice)
-                node = Node(id)
+                node = self.tree.exists_node(Node(id), parent)
+                if not node:
+                    node = Node(id)
+                    self.tree.add_node(node, parent)
                 if id == selected:
                     node.done = True
-                if not self.tree.exists_node(node, parent_id):
-                    self.tree.add_node(node, parent_id)
+                    selected_node = node
+        return selected_node
 
     def print_progress(self, found_cells):
         print("pocet=" + str(len(found_cells)))
@@ -94,40 +265,54 @@ class NumberSearchEngine:
         print(','.join(n.id for n in all_nodes) + '\n')
 
     def _find_empty_cells_with_smallest_choice(self):
-        cell_choices = self._get_all_empty_cells_choices()
-        unsolvable_cells = [choice.cell for choice in cell_choices if len(choice.choices) == 0]
+        # only masks are compared, cells and lists of choices are created for cells with fewest choices
+        geometry = self.game.geometry
+        empty_indexes = self.game.empty_indexes()
+        self.metrics.candidate_computations += len(empty_indexes)
+        min_value = geometry.size + 1
+        min_cells = []
+        unsolvable_cells = []
+        for index in empty_indexes:
+            mask = self.game.candidates_mask_at(index)
+            count = count_numbers(mask)
+            if count == 0:
+                unsolvable_cells.append(geometry.cell_ids[index])
+            elif count < min_value:
+                min_value = count
+                min_cells = [(index, mask)]
+            elif count == min_value:
+                min_cells.append((index, mask))
         if len(unsolvable_cells) > 0:
             raise EmptyCellsWithNoChoicesException('Following cells are unsolvable {}'.format(
-                ', '.join(str(cell.id) for cell in unsolvable_cells)))
-
-        lst = [choice for choice in cell_choices if len(choice.choices) > 0]
-        if len(lst) == 0:
-            return []
-        min_value = min(len(choice.choices) for choice in lst)
-        min_cells = [choice for choice in cell_choices if len(choice.choices) == min_value]
-        return min_cells
+                ', '.join(unsolvable_cells)))
+        return [SearchResult(Cell(geometry.cell_ids[index], geometry=geometry), mask_to_numbers(mask))
+                for index, mask in min_cells]
 
     def _get_all_empty_cells_choices(self):
-        empty_cells = [c for c in self.game.empty()]
+        geometry = self.game.geometry
         cell_choices = []
-        for c in empty_cells:
-            choices = self._find_possible_value_for_cell(c)
-            cell_choices.append(SearchResult(c, choices))
+        empty_indexes = self.game.empty_indexes()
+        self.metrics.candidate_computations += len(empty_indexes)
+        for index in empty_indexes:
+            choices = mask_to_numbers(self.game.candidates_mask_at(index))
+            cell_choices.append(SearchResult(Cell(geometry.cell_ids[index], geometry=geometry), choices))
         return cell_choices
 
-
     def _find_possible_value_for_cell(self, cell):
-        all_nums = {1, 2, 3, 4, 5, 6, 7, 8, 9}
-        missing_vals_4_row = all_nums.difference(c.num for c in self.game.filled() if c.row == cell.row and
-                                                 c.id != cell.id)
-        missing_vals_4_col = all_nums.difference(c.num for c in self.game.filled() if c.col == cell.col and
-                                                 c.id != cell.id)
-        missing_vals_4_square = all_nums.difference(c.num for c in self.game.filled() if c.square == cell.square
-                                                    and c.id != cell.id)
-        #return prunik
-        tmp = missing_vals_4_row.intersection(missing_vals_4_col)
-        result = tmp.intersection(missing_vals_4_square)
-        return list(result)
+        return self.game.candidates(cell)
+
+
+def count_solutions(game, limit=2, propagate_singles=True):
+    """
+    counts solutions of game up to limit (limit=2 is check of uniqueness),
+    game is not changed
+    """
+    return NumberSearchEngine(game.copy(), propagate_singles).count_solutions(limit)
+
+
+def iter_solutions(game, propagate_singles=True):
+    """lazy generator of solutions of game, game is not changed"""
+    return NumberSearchEngine(game.copy(), propagate_singles).iter_solutions()
 
 
 class SearchResult:
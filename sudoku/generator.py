@@ -0,0 +1,122 @@
+"""Generator of new games: random full grid, then clues are removed while game has one solution"""
+import argparse
+import multiprocessing
+import random
+
+from sudoku.engine_dlx import ExactCoverEngine
+from sudoku.engine_v2 import NumberSearchEngine
+from sudoku.structures import Game, Cell, CELL_IDS, ROW_OF, COL_OF, SQUARE_UNITS
+from sudoku.utils import GameFormatter
+
+
+SYMMETRIES = ('none', 'rotational', 'mirror', 'diagonal')
+
+
+def symmetry_groups(symmetry):
+    """board indexes grouped by cells which are removed together to keep symmetry"""
+    groups = {}
+    for index in range(81):
+        row, col = ROW_OF[index], COL_OF[index]
+        if symmetry == 'none':
+            other = index
+        elif symmetry == 'rotational':
+            other = 80 - index
+        elif symmetry == 'mirror':
+            other = 9 * row + 8 - col
+        elif symmetry == 'diagonal':
+            other = 9 * col + row
+        else:
+            raise ValueError('Unknown symmetry ({})'.format(symmetry))
+        groups.setdefault(min(index, other), sorted({index, other}))
+    return list(groups.values())
+
+
+class GameGenerator:
+    """
+    target_clues - removing of clues stops at this count (0 means remove as many as possible),
+    solver - 'dlx' or 'v2' engine used for checks of uniqueness
+    """
+
+    def __init__(self, symmetry='none', target_clues=0, solver='dlx'):
+        if solver not in ('dlx', 'v2'):
+            raise ValueError('Unknown solver ({})'.format(solver))
+        self.groups = symmetry_groups(symmetry)
+        self.target_clues = target_clues
+        self.solver = solver
+
+    def _count_solutions(self, game):
+        if self.solver == 'dlx':
+            return ExactCoverEngine(game).count_solutions(limit=2)
+        return NumberSearchEngine(game, propagate_singles=True).count_solutions(limit=2)
+
+    def full_grid(self, rnd):
+        """random solved board (bytearray of 81 numbers)"""
+        # squares on diagonal are independent, rest is completed by solver
+        cells = []
+        for square in (0, 4, 8):
+            numbers = list(range(1, 10))
+            rnd.shuffle(numbers)
+            cells.extend(Cell(CELL_IDS[index], num) for index, num in zip(SQUARE_UNITS[square], numbers))
+        game = Game(cells)
+        NumberSearchEngine(game, propagate_singles=True).find_numbers()
+        return game.board
+
+    def generate(self, seed=None):
+        """new game with exactly one solution"""
+        rnd = random.Random(seed)
+        board = bytearray(self.full_grid(rnd))
+        clues = 81
+        groups = list(self.groups)
+        rnd.shuffle(groups)
+        for group in groups:
+            if clues - len(group) < self.target_clues:
+                continue
+            removed = [(index, board[index]) for index in group]
+            for index in group:
+                board[index] = 0
+            if self._count_solutions(Game.from_board(board)) == 1:
+                clues -= len(group)
+            else:
+                for index, num in removed:
+                    board[index] = num
+            if clues <= self.target_clues:
+                break
+        return Game.from_board(board)
+
+
+def _generate(task):
+    seed, symmetry, target_clues, solver = task
+    return GameGenerator(symmetry, target_clues, solver).generate(seed)
+
+
+def generate_many(count, seed=0, symmetry='none', target_clues=0, solver='dlx', workers=None):
+    """
+    generates count games, game n is generated from seed + n, so result does not depend
+    on number of workers (processes, 1 generates in current process)
+    """
+    tasks = [(seed + n, symmetry, target_clues, solver) for n in range(count)]
+    if workers == 1:
+        return [_generate(task) for task in tasks]
+    with multiprocessing.Pool(workers) as pool:
+        return pool.map(_generate, tasks)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Generate games with one solution.')
+    parser.add_argument('--count', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--symmetry', default='none', choices=SYMMETRIES)
+    parser.add_argument('--clues', type=int, default=0, help='target count of clues (0 = minimal)')
+    parser.add_argument('--solver', default='dlx', choices=('dlx', 'v2'))
+    parser.add_argument('--workers', type=int, default=None)
+    options = parser.parse_args(args)
+
+    games = generate_many(options.count, options.seed, options.symmetry, options.clues, options.solver,
+                          options.workers)
+    for game in games:
+        print('--------------')
+        print(GameFormatter(game).text_block())
+
+
+if __name__ == "__main__":
+    main()
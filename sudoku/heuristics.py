@@ -0,0 +1,99 @@
+"""
+Branching strategies of NumberSearchEngine - which cell is branched on (from cells with fewest
+choices) and in which order its choices are tried.
+Strategy name is '<cell selection>+<value order>', e.g. 'degree+lcv'.
+"""
+import random
+
+
+class FirstCell:
+    """first cell with fewest choices (by board index)"""
+    name = 'first'
+
+    def select(self, game, found_cells):
+        return found_cells[0]
+
+
+class DegreeCell:
+    """cell with fewest choices which has most empty peers (constrains most other cells)"""
+    name = 'degree'
+
+    def select(self, game, found_cells):
+        board = game.board
+        peers = game.geometry.peers
+        return max(found_cells, key=lambda found: sum(1 for index in peers[found.cell.index] if not board[index]))
+
+
+class RandomCell:
+    """random cell with fewest choices, seed makes search repeatable"""
+    name = 'random'
+
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
+
+    def select(self, game, found_cells):
+        return self.random.choice(found_cells)
+
+
+class SmallestValue:
+    name = 'smallest'
+
+    def order(self, game, index, choices):
+        return sorted(choices)
+
+
+class LeastConstrainingValue:
+    """values which remove fewest choices of empty peers first"""
+    name = 'lcv'
+
+    def order(self, game, index, choices):
+        board = game.board
+        peers = [peer for peer in game.geometry.peers[index] if not board[peer]]
+        masks = [game.candidates_mask_at(peer) for peer in peers]
+        return sorted(choices, key=lambda num: sum(1 for mask in masks if mask & (1 << num)))
+
+
+class FrequencyValue:
+    """values most often placed on board first, they have fewest places left"""
+    name = 'frequency'
+
+    def order(self, game, index, choices):
+        row_counts = game.unit_counts[:game.geometry.size]
+        return sorted(choices, key=lambda num: -sum(counts[num] for counts in row_counts))
+
+
+CELL_SELECTIONS = {selection.name: selection for selection in (FirstCell, DegreeCell, RandomCell)}
+VALUE_ORDERS = {order.name: order for order in (SmallestValue, LeastConstrainingValue, FrequencyValue)}
+
+
+class BranchingStrategy:
+
+    def __init__(self, cell_selection='first', value_order='smallest', seed=None):
+        if cell_selection not in CELL_SELECTIONS:
+            raise ValueError('Unknown cell selection ({})'.format(cell_selection))
+        if value_order not in VALUE_ORDERS:
+            raise ValueError('Unknown value order ({})'.format(value_order))
+        self.cell_selection = RandomCell(seed) if cell_selection == 'random' else CELL_SELECTIONS[cell_selection]()
+        self.value_order = VALUE_ORDERS[value_order]()
+
+    @classmethod
+    def from_name(cls, name, seed=None):
+        """strategy from name 'degree+lcv' (value order can be omitted)"""
+        cell_selection, _, value_order = name.partition('+')
+        return cls(cell_selection, value_order or 'smallest', seed)
+
+    @property
+    def name(self):
+        return self.cell_selection.name + '+' + self.value_order.name
+
+    def __repr__(self):
+        return 'BranchingStrategy({0})'.format(self.name)
+
+    def choose(self, game, found_cells):
+        """returns SearchResult of cell to branch on, its choices are in order in which they are tried"""
+        found = self.cell_selection.select(game, found_cells)
+        found.choices = self.value_order.order(game, found.cell.index, found.choices)
+        return found
+
+
+STRATEGIES = [cell + '+' + value for cell in CELL_SELECTIONS for value in VALUE_ORDERS]
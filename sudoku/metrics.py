@@ -0,0 +1,54 @@
+import time
+from contextlib import contextmanager
+
+
+class SolverMetrics:
+    """counters and times collected by engine during search, readable after find_numbers"""
+
+    def __init__(self):
+        self.nodes_expanded = 0
+        self.backtracks = 0
+        self.propagations = 0
+        self.candidate_computations = 0
+        self.max_depth = 0
+        # name of branching strategy (see heuristics), None for engines without strategies
+        self.strategy = None
+        # seconds spent in every phase of search (by phase name)
+        self.phase_times = {}
+
+    def __repr__(self):
+        return 'SolverMetrics(nodes_expanded={0},backtracks={1},propagations={2},max_depth={3})'.format(
+            self.nodes_expanded, self.backtracks, self.propagations, self.max_depth)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + time.perf_counter() - start
+
+    def node_expanded(self, depth):
+        self.nodes_expanded += 1
+        if depth + 1 > self.max_depth:
+            self.max_depth = depth + 1
+
+    @classmethod
+    def from_dict(cls, values):
+        """metrics from as_dict (e.g. restored from checkpoint)"""
+        metrics = cls()
+        for name, value in values.items():
+            setattr(metrics, name, value)
+        metrics.phase_times = dict(metrics.phase_times)
+        return metrics
+
+    def as_dict(self):
+        return {
+            'nodes_expanded': self.nodes_expanded,
+            'backtracks': self.backtracks,
+            'propagations': self.propagations,
+            'candidate_computations': self.candidate_computations,
+            'max_depth': self.max_depth,
+            'strategy': self.strategy,
+            'phase_times': dict(self.phase_times),
+        }
@@ -0,0 +1,158 @@
+"""
+Packed binary format of games with random access through mmap.
+
+header (12 bytes): magic 'SDKP', version (1 byte), flags (1 byte, bit 0 = solutions are included),
+2 reserved bytes, count of games (uint32, little endian).
+Every game is record of 41 bytes - 81 cells by 4 bits (first cell in high half of byte, 0 is empty cell),
+with solutions every record is followed by 41 bytes of solved board.
+"""
+import argparse
+import mmap
+import struct
+
+from sudoku.engine_dlx import ExactCoverEngine
+from sudoku.structures import Game
+from sudoku.task_readers import GameFileReader
+
+
+MAGIC = b'SDKP'
+VERSION = 1
+FLAG_SOLUTIONS = 1
+HEADER = struct.Struct('<4sBBxxI')
+BOARD_SIZE = 41
+
+_HIGH_HALF = bytes(byte >> 4 for byte in range(256))
+_LOW_HALF = bytes(byte & 0x0F for byte in range(256))
+
+
+def pack_board(board):
+    """81 numbers (0 is empty cell) packed to 41 bytes"""
+    cells = bytes(board) + b'\0'
+    return bytes((cells[i] << 4) | cells[i + 1] for i in range(0, 82, 2))
+
+
+def unpack_board(record):
+    """41 packed bytes to board (bytearray of 81 numbers)"""
+    record = bytes(record)
+    board = bytearray(82)
+    board[0::2] = record.translate(_HIGH_HALF)
+    board[1::2] = record.translate(_LOW_HALF)
+    del board[81:]
+    return board
+
+
+class PackedGameWriter:
+
+    def __init__(self, filename, with_solutions=False):
+        self.file = open(filename, 'wb')
+        self.with_solutions = with_solutions
+        self.count = 0
+        self._write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _write_header(self):
+        flags = FLAG_SOLUTIONS if self.with_solutions else 0
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, flags, self.count))
+
+    def write(self, board, solution=None):
+        if self.with_solutions and solution is None:
+            raise ValueError('Solution is required')
+        self.file.write(pack_board(board))
+        if self.with_solutions:
+            self.file.write(pack_board(solution))
+        self.count += 1
+
+    def close(self):
+        if not self.file.closed:
+            self._write_header()
+            self.file.close()
+
+
+class PackedGameReader:
+    """random access to packed games, records are read from mmap without copying"""
+
+    def __init__(self, filename):
+        self.file = open(filename, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, self.count = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError('{} is not packed games file'.format(filename))
+        self.with_solutions = bool(flags & FLAG_SOLUTIONS)
+        self.record_size = 2 * BOARD_SIZE if self.with_solutions else BOARD_SIZE
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        """records (memoryviews) must be released before"""
+        self.map.close()
+        self.file.close()
+
+    def _slice(self, index, offset):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        start = HEADER.size + index * self.record_size + offset
+        return memoryview(self.map)[start:start + BOARD_SIZE]
+
+    def record(self, index):
+        """packed game (memoryview to mmap) by index from 0"""
+        return self._slice(index, 0)
+
+    def solution_record(self, index):
+        if not self.with_solutions:
+            return None
+        return self._slice(index, BOARD_SIZE)
+
+    def get_board(self, index):
+        with self.record(index) as record:
+            return unpack_board(record)
+
+    def get_solution_board(self, index):
+        if not self.with_solutions:
+            return None
+        with self.solution_record(index) as record:
+            return unpack_board(record)
+
+    def get_game(self, index):
+        return Game.from_board(self.get_board(index))
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.get_game(index)
+
+
+def convert_text_file(source, target, with_solutions=False):
+    """converts games file read by GameFileReader to packed file, returns count of games"""
+    with PackedGameWriter(target, with_solutions) as writer:
+        for _, cells in GameFileReader(source).iter_games():
+            game = Game(cells)
+            board = bytes(game.board)
+            solution = None
+            if with_solutions:
+                if not ExactCoverEngine(game).find_numbers():
+                    raise ValueError('Game {} has no solution'.format(writer.count + 1))
+                solution = game.board
+            writer.write(board, solution)
+        return writer.count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Convert games file to packed binary file.')
+    parser.add_argument('source')
+    parser.add_argument('target')
+    parser.add_argument('--solutions', action='store_true', help='solve games and include solutions')
+    options = parser.parse_args()
+    print('{} games converted'.format(convert_text_file(options.source, options.target, options.solutions)))
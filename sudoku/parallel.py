@@ -0,0 +1,213 @@
+"""
+Solving of one hard game in pool of processes - top levels of search tree of NumberSearchEngine
+are expanded into subproblems (partial assignments given by paths of tree nodes), subproblems
+are solved concurrently and first solution found cancels the others.
+"""
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import time
+
+from sudoku.budget import (Budget, BudgetExhaustedException, CancellationToken, SolveResult,
+                           SOLVED, UNSOLVABLE, BUDGET_EXHAUSTED)
+from sudoku.engine_v2 import NumberSearchEngine, EmptyCellsWithNoChoicesException
+from sudoku.status_tree import Node
+from sudoku.structures import Game, Cell
+
+
+MAX_SPLIT_DEPTH = 8
+# how often is budget of whole solve checked while subproblems are solved
+POLL_INTERVAL = 0.05
+
+
+def split_game(game, min_subproblems, propagate_singles=True, strategy=None, max_depth=MAX_SPLIT_DEPTH):
+    """
+    expands search tree of game breadth first (with same branching as NumberSearchEngine)
+    until it has at least min_subproblems open leaves, returns (tree, leaves),
+    path of leaf (Node.path) is partial assignment, leaves without solution are left out.
+    Leaf with empty path (game is solved by propagation) or solved leaf can be only leaf.
+    """
+    engine = NumberSearchEngine(game.copy(), propagate_singles, strategy=strategy)
+    # solution cells game already had are kept in every leaf
+    base = len(engine.game.trail)
+    leaves = [None]
+    for _ in range(max_depth):
+        if len(leaves) >= min_subproblems:
+            break
+        next_leaves = []
+        for leaf in leaves:
+            found = _expand(engine, leaf, base)
+            if found is None:
+                continue
+            if not found:
+                # game is solved in this branch
+                return engine.tree, [leaf]
+            for choice in found.choices:
+                node = Node(found.cell.id + '=' + str(choice))
+                engine.tree.add_node(node, leaf)
+                next_leaves.append(node)
+        if not next_leaves:
+            return engine.tree, []
+        leaves = next_leaves
+    return engine.tree, leaves
+
+
+def _expand(engine, leaf, base):
+    """
+    SearchResult of cell to branch on in leaf, empty list if game is solved in leaf
+    and None if leaf has no solution, game is undone to first base solution cells
+    """
+    game = engine.game
+    game.undo(base)
+    for node_id in (leaf.path if leaf else ()):
+        game.add_cell(engine._node_cell(Node(node_id)))
+    try:
+        if engine.propagate_singles:
+            engine.propagate()
+        if not game.empty_count:
+            return []
+        return engine.strategy.choose(game, engine._find_empty_cells_with_smallest_choice())
+    except EmptyCellsWithNoChoicesException:
+        return None
+
+
+def assign(game, path):
+    """
+    board of game with numbers of nodes in path ('a1=5', ...) as input numbers,
+    cells of path must be empty in game
+    """
+    board = bytearray(game.board)
+    for node_id in path:
+        ident, num = node_id.split('=')
+        index = game.geometry.cell_index[ident]
+        if board[index]:
+            raise ValueError('Cell {} is already filled'.format(ident))
+        board[index] = int(num)
+    return bytes(board)
+
+
+# cancellation event of worker process, set by ParallelSearch when game is solved
+_cancelled = None
+
+
+def _init_worker(event):
+    global _cancelled
+    _cancelled = event
+
+
+def _solve_subproblem(board, propagate_singles, strategy, limits):
+    """runs in worker, returns (status, board, reason, nodes expanded)"""
+    engine = NumberSearchEngine(Game.from_board(board), propagate_singles, strategy=strategy)
+    result = engine.solve(Budget(*limits, token=CancellationToken(_cancelled)))
+    return result.status, result.board, result.reason, result.metrics['nodes_expanded']
+
+
+class ParallelSearch:
+    """
+    solves games one by one, every game in all worker processes,
+    subproblems_per_worker - count of subproblems created for every worker (more small ones
+    balance load better, search tree is expanded by whole levels so there can be more)
+    """
+
+    def __init__(self, workers=None, propagate_singles=True, strategy=None, subproblems_per_worker=4):
+        self.workers = workers or os.cpu_count()
+        self.propagate_singles = propagate_singles
+        self.strategy = strategy
+        self.subproblems_per_worker = subproblems_per_worker
+        self.cancelled = multiprocessing.Event()
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            self.workers, initializer=_init_worker, initargs=(self.cancelled,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown()
+
+    def solve(self, game, budget=None):
+        """
+        solves game (changed in place like by engines) within budget, returns budget.SolveResult,
+        time limit and token are for whole solve, limits of nodes and tree size for every subproblem
+        """
+        if not game.is_valid():
+            return SolveResult(UNSOLVABLE, game.board, reason='invalid')
+        budget = budget or Budget()
+        budget.start()
+        tree, leaves = split_game(game, self.workers * self.subproblems_per_worker,
+                                  self.propagate_singles, self.strategy)
+        metrics = {'subproblems': len(leaves), 'split_size': tree.size, 'nodes_expanded': 0}
+        if not leaves:
+            return SolveResult(UNSOLVABLE, game.board, metrics=metrics)
+
+        # strategy is sent by name, random selection is not repeatable in workers
+        strategy = self.strategy.name if hasattr(self.strategy, 'name') else self.strategy
+        time_limit = budget.deadline - time.monotonic() if budget.deadline is not None else None
+        limits = (time_limit, budget.max_nodes, budget.max_tree_size)
+        pending = {self.executor.submit(_solve_subproblem, assign(game, leaf.path if leaf else ()),
+                                        self.propagate_singles, strategy, limits)
+                   for leaf in leaves}
+        status, board, reason = UNSOLVABLE, None, None
+        try:
+            while pending and status != SOLVED:
+                done, pending = concurrent.futures.wait(pending, POLL_INTERVAL,
+                                                        concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    sub_status, sub_board, sub_reason, nodes = future.result()
+                    metrics['nodes_expanded'] += nodes
+                    if sub_status == SOLVED and status != SOLVED:
+                        status, board = SOLVED, sub_board
+                    elif sub_status == BUDGET_EXHAUSTED and status == UNSOLVABLE:
+                        status, reason = BUDGET_EXHAUSTED, sub_reason
+                if pending and status != SOLVED:
+                    budget.check()
+        except BudgetExhaustedException as e:
+            status, reason = BUDGET_EXHAUSTED, e.reason
+        finally:
+            self._cancel(pending)
+
+        if status == SOLVED:
+            geometry = game.geometry
+            for index in game.empty_indexes():
+                game.add_cell(Cell(geometry.cell_ids[index], board[index], geometry))
+        return SolveResult(status, game.board, reason, metrics)
+
+    def _cancel(self, pending):
+        """stops running subproblems (at their next step), waiting ones are not started"""
+        if not pending:
+            return
+        self.cancelled.set()
+        for future in pending:
+            future.cancel()
+        concurrent.futures.wait(pending)
+        self.cancelled.clear()
+
+
+def solve_parallel(game, workers=None, budget=None, propagate_singles=True, strategy=None):
+    """solves one game in new pool of workers, returns budget.SolveResult"""
+    with ParallelSearch(workers, propagate_singles, strategy) as search:
+        return search.solve(game, budget)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Solve one game in pool of processes.')
+    parser.add_argument('filename')
+    parser.add_argument('index', type=int, help='index of game in file (from 1)')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--strategy', default=None, help='branching strategy, e.g. degree+lcv')
+    parser.add_argument('--timeout', type=float, default=None, help='time limit in seconds')
+    options = parser.parse_args(args)
+
+    game = Game.create_from_file(options.filename, options.index)
+    result = solve_parallel(game, options.workers, Budget(options.timeout), strategy=options.strategy)
+    print(result)
+    if result.solved:
+        print('\n'.join(game.compressed()))
+    print(result.metrics)
+
+
+if __name__ == "__main__":
+    main()
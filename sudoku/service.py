@@ -0,0 +1,236 @@
+"""
+Local HTTP/JSON solve service (asyncio, standard library only).
+
+    POST /solve   {"puzzle": "<text block or 81 chars>", "timeout": 2.5}
+                  -> {"solved": true, "solution": "<81 chars>", "ms": 1.2}
+    GET /stats    -> counters, latency percentiles and throughput
+    GET /health   -> {"status": "ok"}
+
+Solving runs in executor (pool of processes by default), every request has deadline which
+is also time budget of solve, requests over max_queue (solving or waiting for executor)
+are rejected with 503.
+"""
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import time
+
+from sudoku.batch import ENGINES
+from sudoku.benchmark import percentile
+from sudoku.budget import Budget, SOLVED, UNSOLVABLE
+from sudoku.structures import Game
+from sudoku.task_readers import TextBlockReader
+
+
+class BadRequestException(Exception):
+    pass
+
+
+def parse_puzzle(text):
+    """
+    game from text block with 9 rows of 9 cells (TextBlockReader format)
+    or from 81 chars ('.' or '0' is empty cell)
+    """
+    compact = ''.join(text.split())
+    if len(compact) == 81 and '|' not in compact:
+        if any(char not in '.0123456789' for char in compact):
+            raise BadRequestException('Puzzle contains unknown characters')
+        return Game.from_board(bytearray(0 if char == '.' else int(char) for char in compact))
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    if len(lines) != 9 or any(len(line.replace('|', '')) != 9 for line in lines):
+        raise BadRequestException('Puzzle is not 81 chars nor text block of 9 rows')
+    try:
+        return Game(TextBlockReader(text).get_game())
+    except (ValueError, IndexError, KeyError):
+        raise BadRequestException('Puzzle is not 81 chars nor text block of 9 rows')
+
+
+def _solve_board(board, engine_name, time_limit=None):
+    """runs in executor, returns (status, board) of budget.SolveResult"""
+    engine = ENGINES[engine_name](Game.from_board(board))
+    result = engine.solve(Budget(time_limit=time_limit))
+    return result.status, result.board
+
+
+class SolveService:
+
+    def __init__(self, host='127.0.0.1', port=8080, workers=None, max_queue=64, timeout=5.0,
+                 engine='dlx', executor=None):
+        self.host = host
+        self.port = port
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.engine = engine
+        self.executor = executor or concurrent.futures.ProcessPoolExecutor(workers)
+        self.server = None
+        self.pending = 0
+        self.started = time.monotonic()
+        self.counters = collections.Counter()
+        self.latencies = collections.deque(maxlen=10000)
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.started = time.monotonic()
+        return self.server
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        uptime = time.monotonic() - self.started
+        latencies = list(self.latencies)
+        return {
+            'uptime_s': uptime,
+            'pending': self.pending,
+            'max_queue': self.max_queue,
+            'requests': dict(self.counters),
+            'throughput_per_s': self.counters['solved'] / uptime if uptime else 0.0,
+            'p50_ms': percentile(latencies, 50),
+            'p99_ms': percentile(latencies, 99),
+        }
+
+    async def solve(self, puzzle, timeout=None):
+        """returns (HTTP status, response dict)"""
+        if self.pending >= self.max_queue:
+            self.counters['rejected'] += 1
+            return 503, {'error': 'Too many pending requests'}
+        try:
+            game = parse_puzzle(puzzle)
+        except BadRequestException as e:
+            self.counters['bad_request'] += 1
+            return 400, {'error': str(e)}
+        if not game.is_valid():
+            self.counters['bad_request'] += 1
+            return 400, {'error': 'Puzzle has duplicate numbers',
+                         'cells': [cell.id for cell in game.validate(detailed=True)]}
+
+        timeout = min(timeout, self.timeout) if timeout else self.timeout
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        # solve is pending until executor finishes it, also after deadline of request
+        try:
+            future = self.executor.submit(_solve_board, bytes(game.board), self.engine, timeout)
+        except Exception as e:
+            # e.g. BrokenProcessPool
+            return self._error(e)
+        self.pending += 1
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._solve_finished))
+        try:
+            # on timeout waiting solve is cancelled, running one stops by its time budget
+            status, board = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            status = None
+        except Exception as e:
+            return self._error(e)
+        if status not in (SOLVED, UNSOLVABLE):
+            self.counters['timeout'] += 1
+            return 504, {'error': 'Deadline {} s exceeded'.format(timeout)}
+        elapsed = (time.perf_counter() - start) * 1000
+        self.latencies.append(elapsed)
+        if status == UNSOLVABLE:
+            self.counters['unsolvable'] += 1
+            return 200, {'solved': False, 'ms': elapsed}
+        self.counters['solved'] += 1
+        solution = ''.join(str(num) for num in board)
+        return 200, {'solved': True, 'solution': solution, 'ms': elapsed}
+
+    def _solve_finished(self):
+        self.pending -= 1
+
+    def _error(self, exception):
+        self.counters['error'] += 1
+        return 500, {'error': 'Internal error ({})'.format(type(exception).__name__)}
+
+    async def _route(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok'}
+        if method == 'GET' and path == '/stats':
+            return 200, self.stats()
+        if method == 'POST' and path == '/solve':
+            try:
+                request = json.loads(body or b'{}')
+                puzzle = request['puzzle']
+                if not isinstance(puzzle, str):
+                    raise TypeError(puzzle)
+                timeout = float(request['timeout']) if request.get('timeout') else None
+            except (ValueError, KeyError, TypeError):
+                self.counters['bad_request'] += 1
+                return 400, {'error': 'Body must be JSON object with puzzle'}
+            return await self.solve(puzzle, timeout)
+        return 404, {'error': 'Not found'}
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2:
+                return
+            method, path = parts[0], parts[1]
+            content_length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    content_length = int(value.strip())
+            body = await reader.readexactly(content_length) if content_length else b''
+            try:
+                status, response = await self._route(method, path, body)
+            except Exception as e:
+                status, response = self._error(e)
+            self._write_response(writer, status, response)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write_response(writer, status, response):
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error',
+                   503: 'Service Unavailable', 504: 'Gateway Timeout'}
+        body = json.dumps(response).encode('utf-8')
+        headers = ['HTTP/1.1 {} {}'.format(status, reasons[status]),
+                   'Content-Type: application/json',
+                   'Content-Length: {}'.format(len(body)),
+                   'Connection: close']
+        if status == 503:
+            headers.append('Retry-After: 1')
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body)
+
+
+async def serve(service):
+    await service.start()
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Run local solve service.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-queue', type=int, default=64)
+    parser.add_argument('--timeout', type=float, default=5.0, help='deadline of one request in seconds')
+    parser.add_argument('--engine', default='dlx', choices=sorted(ENGINES))
+    options = parser.parse_args(args)
+
+    service = SolveService(options.host, options.port, options.workers, options.max_queue, options.timeout,
+                           options.engine)
+    try:
+        asyncio.run(serve(service))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
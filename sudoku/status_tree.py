@@ -4,6 +4,8 @@ from collections import deque
 
 class Node:
     """ Represent one node in tree """
+    __slots__ = ('id', 'label', 'done', 'children', 'data', 'parent', 'current', 'depth', 'child_index',
+                 'trace_key')
 
     def __init__(self, id, label='', done=False):
         """initialization with ident and label fields"""
@@ -11,9 +13,14 @@ class Node:
         self.label = label
         self.done = done
         self.children = []
-        self.data = ''
+        self.data = None
         self.parent = None
         self.current = False
+        self.depth = 0
+        # children by id, ids are unique only among brothers
+        self.child_index = {}
+        # number of node in trace (see trace.TraceWriter)
+        self.trace_key = None
 
     def __repr__(self):
         """object representation"""
@@ -28,6 +35,16 @@ class Node:
     def __str__(self):
         return '{}'.format(self.id)
 
+    @property
+    def path(self):
+        """ids of nodes from root to this node"""
+        ids = []
+        node = self
+        while node:
+            ids.append(node.id)
+            node = node.parent
+        return tuple(reversed(ids))
+
 
 class Tree:
     """ Represent tree containing nodes """
@@ -35,42 +52,95 @@ class Tree:
     def __init__(self):
         """initialization - create empty list of nodes"""
         self.nodes = []
+        self.root_index = {}
+        # all nodes by id, same id can be in more branches
+        self.index = {}
+        self.current = None
+        # count of all nodes (len counts only root nodes)
+        self.size = 0
 
     def __len__(self):
         return len(self.nodes)
 
     def add_node(self, node, parent_id=None):
-        """ find parent node and add new child to this parent node """
-        if not parent_id:
+        """ find parent node (given by id or node itself) and add new child to this parent node """
+        if parent_id is None:
             self.nodes.append(node)
+            self.root_index.setdefault(node.id, node)
         else:
-            parent = self.find_in_nodes(self.nodes, parent_id)
+            parent = self._resolve(parent_id)
             if parent:
                 node.parent = parent
+                node.depth = parent.depth + 1
                 parent.children.append(node)
+                parent.child_index.setdefault(node.id, node)
             else:
                 raise ValueError('Node not found ({})'.format(str(parent_id)))
+        self.index.setdefault(node.id, []).append(node)
+        self.size += 1
+
+    def remove_node(self, node):
+        """ removes node with all its descendants from tree """
+        if node.parent:
+            siblings, siblings_index = node.parent.children, node.parent.child_index
+        else:
+            siblings, siblings_index = self.nodes, self.root_index
+        self._remove_identical(siblings, node)
+        if siblings_index.get(node.id) is node:
+            del siblings_index[node.id]
+        for removed in self.walk_through_nodes_deep_first([node]):
+            same_id_nodes = self.index[removed.id]
+            self._remove_identical(same_id_nodes, removed)
+            if not same_id_nodes:
+                del self.index[removed.id]
+            if removed is self.current:
+                self.current = None
+            self.size -= 1
+        node.parent = None
+
+    @staticmethod
+    def _remove_identical(nodes, node):
+        for position, item in enumerate(nodes):
+            if item is node:
+                del nodes[position]
+                return
 
     def exists_node(self, node, parent_id):
-        parent = self.find_in_nodes(self.nodes, parent_id)
+        if parent_id is None:
+            return self.root_index.get(node.id)
+        parent = self._resolve(parent_id)
         if not parent:
-            return False
-        found_node = self.find_in_nodes(parent.children, node.id)
-        return found_node
+            return None
+        return parent.child_index.get(node.id)
+
+    def find_by_path(self, path):
+        """ find node by ids of nodes from root, see Node.path """
+        node = None
+        children = self.root_index
+        for node_id in path:
+            node = children.get(node_id)
+            if not node:
+                return None
+            children = node.child_index
+        return node
 
     def set_current(self, node_id):
-        node = self.find_in_nodes(self.nodes, node_id)
+        """ node (given by id or node itself) becomes current, previous current node is done """
+        node = self._resolve(node_id)
+        previous = self.current
+        if previous is not None and previous is not node:
+            previous.current = False
+            previous.done = True
         node.current = True
-        for n in self.walk_through_nodes_deep_first():
-            if n != node and n.current:
-                n.current = False
-                n.done = True
+        self.current = node
 
     def get_current(self):
-        for n in self.walk_through_nodes_deep_first():
-            if n.current:
-                return n
-        return None
+        return self.current
+
+    def _resolve(self, node_or_id):
+        if node_or_id is None or isinstance(node_or_id, Node):
+            return node_or_id
+        return self.find_in_nodes(self.nodes, node_or_id)
 
     def walk_through_nodes_deep_first(self, nodes=None):
         if nodes is None:
@@ -112,8 +182,14 @@ class Tree:
     def find_in_nodes(self, nodes, wanted_id):
         """
         searching node by id in nodes given in parameter.
-        method works recursively
+        method works recursively, searching in whole tree uses index
         """
+        if nodes is self.nodes:
+            found = self.index.get(wanted_id)
+            if not found:
+                return None
+            if len(found) == 1:
+                return found[0]
         if len(nodes) == 0:
             return None
         for node in nodes:
@@ -1,39 +1,114 @@
+import math
+import re
+
 from sudoku.task_readers import GameFileReader
 
 
-class Cell:
-    def __init__(self, id, num=None):
-        self.id = id
-        self.num = num
-        self.solution_cell = False
+LETTERS = 'abcdefghijklmnopqrstuvwxy'
+# symbols of numbers 1..25 in text blocks, '.' (or '0') is empty cell
+SYMBOLS = '123456789ABCDEFGHIJKLMNOP'
+
+
+class Geometry:
+    """
+    board of size x size cells (size = box * box) divided into squares box x box,
+    columns are letters a.., rows are numbers from 1, board index = size * (row - 1) + column index
+    """
+
+    def __init__(self, box):
+        if not 2 <= box <= 5:
+            raise ValueError('Unsupported size of square ({})'.format(box))
+        size = box * box
+        self.box = box
+        self.size = size
+        self.cell_count = size * size
+        self.columns = list(LETTERS[:size])
+        self.symbols = SYMBOLS[:size]
+        self.all_numbers_mask = ((1 << size) - 1) << 1  # bits 1..size, bit n stands for number n
+
+        indexes = range(self.cell_count)
+        self.cell_ids = [col + str(row) for row in range(1, size + 1) for col in self.columns]
+        self.cell_index = {ident: index for index, ident in enumerate(self.cell_ids)}
+        self.row_of = [index // size for index in indexes]
+        self.col_of = [index % size for index in indexes]
+        self.square_of = [box * (index // (size * box)) + (index % size) // box for index in indexes]
+        self.row_units = [[index for index in indexes if self.row_of[index] == n] for n in range(size)]
+        self.col_units = [[index for index in indexes if self.col_of[index] == n] for n in range(size)]
+        self.square_units = [[index for index in indexes if self.square_of[index] == n] for n in range(size)]
+        self.units = self.row_units + self.col_units + self.square_units
+        # numbers of units (to units) of every cell: row, column, square
+        self.cell_units = [(self.row_of[index], size + self.col_of[index], 2 * size + self.square_of[index])
+                           for index in indexes]
+        self.peers = [sorted(set(self.row_units[self.row_of[index]] + self.col_units[self.col_of[index]] +
+                                 self.square_units[self.square_of[index]]) - {index})
+                      for index in indexes]
+        # line of text block - squares separated by '|', optional '|' at the end,
+        # letters in any case like in number()
+        cell_pattern = '[.0{}]{{{}}}'.format(re.escape(self.symbols), box)
+        self.line_pattern = re.compile(r'^{0}(\|{0}){{{1}}}\|?$'.format(cell_pattern, box - 1), re.IGNORECASE)
 
-    @property
-    def row(self):
-        return int(self.id[1])
+    def __repr__(self):
+        return 'Geometry(size={0})'.format(self.size)
 
-    @property
-    def col(self):
-        return self.id[0]
+    def __reduce__(self):
+        # geometries are shared, pickled game refers to geometry only by size
+        return get_geometry, (self.size,)
 
-    @property
-    def square(self):
-        return 3 * self._get_row_index() + self._get_col_index() + 1
+    def symbol(self, num):
+        return self.symbols[num - 1] if num else '.'
 
-    def _get_row_index(self):
-        if self.row < 4:
+    def number(self, symbol):
+        """number of symbol, 0 for empty cell"""
+        if symbol in '.0':
             return 0
-        elif 4 <= self.row < 7:
-            return 1
-        else:
-            return 2
+        num = self.symbols.find(symbol.upper()) + 1
+        if not num:
+            raise ValueError('Unknown symbol ({})'.format(symbol))
+        return num
+
+
+_GEOMETRIES = {}
+
+
+def get_geometry(size=9):
+    """geometry of board size x size (4, 9, 16 or 25), geometries are shared"""
+    if size not in _GEOMETRIES:
+        box = math.isqrt(size)
+        if box * box != size:
+            raise ValueError('Size of board must be square of number ({})'.format(size))
+        _GEOMETRIES[size] = Geometry(box)
+    return _GEOMETRIES[size]
+
+
+STANDARD = get_geometry(9)
+
+# index tables of standard 9x9 board
+COLUMNS = STANDARD.columns
+CELL_IDS = STANDARD.cell_ids
+CELL_INDEX = STANDARD.cell_index
+ROW_OF = STANDARD.row_of
+COL_OF = STANDARD.col_of
+SQUARE_OF = STANDARD.square_of
+ROW_UNITS = STANDARD.row_units
+COL_UNITS = STANDARD.col_units
+SQUARE_UNITS = STANDARD.square_units
+UNITS = STANDARD.units
+CELL_UNITS = STANDARD.cell_units
+PEERS = STANDARD.peers
 
-    def _get_col_index(self):
-        if self.col.lower() in ("a", "b", "c"):
-            return 0
-        elif self.col.lower() in ("d", "e", "f"):
-            return 1
-        else:
-            return 2
+
+class Cell:
+    __slots__ = ('id', 'num', 'solution_cell', 'index', 'row', 'col', 'square')
+
+    def __init__(self, id, num=None, geometry=STANDARD):
+        self.id = id
+        self.num = num
+        self.solution_cell = False
+        # coordinates are computed once, cells are compared and grouped very often
+        self.index = geometry.cell_index[id]
+        self.row = geometry.row_of[self.index] + 1
+        self.col = id[0]
+        self.square = geometry.square_of[self.index] + 1
 
     def __str__(self):
         return 'Cell(id={},value={})'.format(self.id, self.num)
@@ -52,27 +127,136 @@ class DuplicateCellException(Exception):
     pass
 
 
+ALL_NUMBERS_MASK = STANDARD.all_numbers_mask
+
+
+def mask_to_numbers(mask):
+    return [n for n in range(1, mask.bit_length()) if mask & (1 << n)]
+
+
+def count_numbers(mask):
+    return bin(mask).count('1')
+
+
 class Game:
 
-    def __init__(self, input_cells):
+    def __init__(self, input_cells, geometry=STANDARD):
         self.cells = input_cells
+        self.geometry = geometry
+        size = geometry.size
+        # dense board, 0 means empty cell
+        self.board = bytearray(geometry.cell_count)
+        # board indexes of solution cells in order they were added, used for undo
+        self.trail = []
+        # "used number" masks for every row, column and square (index 0..size-1)
+        self.row_masks = [0] * size
+        self.col_masks = [0] * size
+        self.square_masks = [0] * size
+        # how many times is every number (index 1..size) in every unit (see Geometry.units)
+        self.unit_counts = [[0] * (size + 1) for _ in geometry.units]
+        # count of duplicate numbers in rows, columns and squares
+        self.conflicts = [0, 0, 0]
+        for cell in self.cells:
+            if cell.num:
+                self._place(cell.index, cell.num)
+
+    def _place(self, index, num):
+        self.board[index] = num
+        bit = 1 << num
+        geometry = self.geometry
+        for kind, unit in enumerate(geometry.cell_units[index]):
+            counts = self.unit_counts[unit]
+            counts[num] += 1
+            if counts[num] > 1:
+                self.conflicts[kind] += 1
+        self.row_masks[geometry.row_of[index]] |= bit
+        self.col_masks[geometry.col_of[index]] |= bit
+        self.square_masks[geometry.square_of[index]] |= bit
+
+    def _remove(self, index):
+        num = self.board[index]
+        self.board[index] = 0
+        bit = 1 << num
+        geometry = self.geometry
+        row, col, square = geometry.cell_units[index]
+        for kind, unit in enumerate((row, col, square)):
+            counts = self.unit_counts[unit]
+            counts[num] -= 1
+            if counts[num] > 0:
+                self.conflicts[kind] -= 1
+        if not self.unit_counts[row][num]:
+            self.row_masks[geometry.row_of[index]] &= ~bit
+        if not self.unit_counts[col][num]:
+            self.col_masks[geometry.col_of[index]] &= ~bit
+        if not self.unit_counts[square][num]:
+            self.square_masks[geometry.square_of[index]] &= ~bit
+
+    def candidates_mask_at(self, index):
+        """bit mask of numbers which can be placed into (empty) cell on board index"""
+        geometry = self.geometry
+        used = (self.row_masks[geometry.row_of[index]] |
+                self.col_masks[geometry.col_of[index]] |
+                self.square_masks[geometry.square_of[index]])
+        return geometry.all_numbers_mask & ~used
+
+    def candidates_mask(self, cell):
+        return self.candidates_mask_at(cell.index)
+
+    def candidates(self, cell):
+        return mask_to_numbers(self.candidates_mask(cell))
 
     def reconstruct_saved_game(self, formatted_solution_cells):
         cells = formatted_solution_cells.split(',')
         for cell in cells:
-            self.add_cell(Cell(cell[:2], int(cell[3])))
+            ident, num = cell.split('=')
+            self.add_cell(Cell(ident, int(num), self.geometry))
+
+    def copy(self):
+        """new game with same input and solution cells (in same order)"""
+        geometry = self.geometry
+        game = Game([Cell(cell.id, cell.num, geometry) for cell in self.get_input_cells()], geometry)
+        for index in self.trail:
+            game.add_cell(Cell(geometry.cell_ids[index], self.board[index], geometry))
+        return game
+
+    @classmethod
+    def from_board(cls, board, geometry=None):
+        """
+        game with input numbers from board (size * size numbers, 0 is empty cell),
+        without geometry it is given by length of board
+        """
+        geometry = geometry or get_geometry(math.isqrt(len(board)))
+        return cls([Cell(geometry.cell_ids[index], num, geometry) for index, num in enumerate(board) if num],
+                   geometry)
 
     @classmethod
-    def create_from_file(cls, filename, game_index):
-        input_cells = GameFileReader(filename).get_game(game_index)
-        return cls(input_cells)
+    def create_from_file(cls, filename, game_index, geometry=STANDARD):
+        input_cells = GameFileReader(filename, geometry=geometry).get_game(game_index)
+        return cls(input_cells, geometry)
 
     def add_cell(self, cell):
-        if cell in self.cells:
+        if self.board[cell.index]:
             raise DuplicateCellException('Cell {} already is in game.'.format(cell))
 
         cell.solution_cell = True
         self.cells.append(cell)
+        if cell.num:
+            self._place(cell.index, cell.num)
+        self.trail.append(cell.index)
+
+    def undo(self, count=0):
+        """
+        remove solution cells added after first count solution cells
+        (in reverse order), returns number of removed cells
+        """
+        removed = 0
+        while len(self.trail) > count:
+            index = self.trail.pop()
+            self.cells.pop()
+            if self.board[index]:
+                self._remove(index)
+            removed += 1
+        return removed
 
     def get_solution_cells(self):
         return [cell for cell in self.cells if cell.solution_cell]
@@ -89,17 +273,18 @@ class Game:
 
     @property
     def empty_count(self):
-        return 81 - self.filled_count
+        return self.board.count(0)
 
     @property
     def filled_count(self):
-        return len([c for c in self.cells if c.num])
+        return self.geometry.cell_count - self.board.count(0)
+
+    def empty_indexes(self):
+        return [index for index, num in enumerate(self.board) if not num]
 
     def empty(self):
-        for row in range(1, 10):
-            for col in ["a", "b", "c", "d", "e", "f", "g", "h", "i"]:
-                if Cell(col + str(row)) not in self.cells:
-                    yield Cell(col + str(row))
+        for index in self.empty_indexes():
+            yield Cell(self.geometry.cell_ids[index], geometry=self.geometry)
 
     def filled(self):
         for c in self.cells:
@@ -107,51 +292,39 @@ class Game:
                 yield c
 
     def compressed(self):
+        size = self.geometry.size
+        symbol = self.geometry.symbol
         lst = []
-        for r in range(1, 10):
-            s = ""
-            for c in ["a", "b", "c", "d", "e", "f", "g", "h", "i"]:
-                tmp_cell = Cell(str(c) + str(r))
-                index = self.cells.index(tmp_cell)
-                cell = self.cells[index]
-                s += (str(cell.num) if cell.num else ".")
-            lst.append(s)
+        for row in range(size):
+            lst.append(''.join(symbol(num) for num in self.board[size * row:size * row + size]))
         return lst
 
-    def validate(self):
+    def is_valid(self):
+        """True if no number is duplicate in any row, column or square"""
+        return not any(self.conflicts)
+
+    def validate(self, detailed=False):
+        """
+        returns letters of invalid entities - r(ows), c(olumns), s(quares),
+        with detailed=True returns list of cells with duplicate numbers
+        """
+        if detailed:
+            return self.conflicting_cells()
         return ("" +
-                ("r" if not self._validate_rows() else "") +
-                ("c" if not self._validate_cols() else "") +
-                ("s" if not self._validate_squares() else ""))
-
-    def _validate_rows(self):
-        return self._validate_entity(list(range(1, 10)), "row")
-
-    def _validate_cols(self):
-        return self._validate_entity(["a", "b", "c", "d", "e", "f", "g", "h", "i"], "col")
-
-    def _validate_squares(self):
-        return self._validate_entity(list(range(1, 10)), "square")
-
-    def _validate_entity(self, list, prop_name):
-        for item in list:
-            cells = [c for c in self.cells if getattr(c, prop_name) == item]
-            ok = self._validate_group_cells(cells)
-            if not ok:
-                return False
-        return True
-
-    def _validate_group_cells(self, cells):
-        d = {n: 0 for n in range(1, 10)}
-        d[None] = 0
-        for k, v in d.items():
-            count = len([c for c in cells if c.num == k])
-            if count > 1 and k:
-                return False
-        return True
+                ("r" if self.conflicts[0] else "") +
+                ("c" if self.conflicts[1] else "") +
+                ("s" if self.conflicts[2] else ""))
+
+    def conflicting_cells(self):
+        if self.is_valid():
+            return []
+        indexes = set()
+        geometry = self.geometry
+        for unit, counts in zip(geometry.units, self.unit_counts):
+            for num in range(1, geometry.size + 1):
+                if counts[num] > 1:
+                    indexes.update(index for index in unit if self.board[index] == num)
+        return [Cell(geometry.cell_ids[index], self.board[index], geometry) for index in sorted(indexes)]
 
     def get_cell_value(self, ident):
-        cell = Cell(ident)
-        if cell in self.cells:
-            return self.cells[self.cells.index(cell)].num
-        return None
+        return self.board[self.geometry.cell_index[ident]] or None
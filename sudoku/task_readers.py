@@ -1,47 +1,146 @@
-import re
+import os
+import struct
+from array import array
 
 
 class GameFileReader:
+    """
+    reads games from file where every game starts by line '----...',
+    games are indexed from 1 and read lazily line by line.
+    Byte offsets of games can be saved to index file (filename + '.idx')
+    so get_game seeks directly to wanted game.
+    geometry (structures.Geometry) is size of boards in file, default is 9x9
+    """
+
+    INDEX_MAGIC = b'SDKI'
+
+    def __init__(self, filename, use_index=False, geometry=None):
+        from sudoku.structures import STANDARD
 
-    def __init__(self, filename):
         self.filename = filename
-        self.games = {}
+        self.use_index = use_index
+        self.geometry = geometry or STANDARD
+        self.offsets = None
+
+    @property
+    def index_filename(self):
+        return self.filename + '.idx'
+
+    def _iter_lines(self, file):
+        """yields (offset of next line, stripped line)"""
+        offset = file.tell()
+        for line in file:
+            offset += len(line)
+            yield offset, line.decode('utf-8').strip()
 
-    def _read_file(self):
-        self.games = {}
+    def _read_game_lines(self, file):
+        lines = []
+        for _, line in self._iter_lines(file):
+            if line.startswith('----'):
+                break
+            if self.geometry.line_pattern.match(line):
+                lines.append(line)
+        return lines
+
+    def iter_text_blocks(self):
+        """generator of (index, text block) for all games in file"""
         index = 0
-        with open(self.filename, encoding='utf-8') as file:
-            for line in file:
+        lines = None
+        with open(self.filename, 'rb') as file:
+            for _, line in self._iter_lines(file):
                 if line.startswith('----'):
+                    if lines is not None:
+                        yield index, '\n'.join(lines)
                     index += 1
-                    self.games[index] = []
-                    continue
-                if re.match(r'^[.1-9]{3}|[.1-9]{3}|[.1-9]{3}$', line.strip()):
-                    self.games[index].append(line.strip())
+                    lines = []
+                elif lines is not None and self.geometry.line_pattern.match(line):
+                    lines.append(line)
+        if lines is not None:
+            yield index, '\n'.join(lines)
+
+    def iter_games(self):
+        """generator of (index, list of cells) for all games in file"""
+        for index, text_block in self.iter_text_blocks():
+            yield index, TextBlockReader(text_block, self.geometry).get_game()
+
+    def _scan_offsets(self):
+        offsets = array('Q')
+        with open(self.filename, 'rb') as file:
+            for offset, line in self._iter_lines(file):
+                if line.startswith('----'):
+                    offsets.append(offset)
+        return offsets
+
+    def _file_stamp(self):
+        stat = os.stat(self.filename)
+        return struct.pack('<4sQQ', self.INDEX_MAGIC, stat.st_size, stat.st_mtime_ns)
+
+    def _load_index(self):
+        """returns offsets saved in index file or None if index file is missing or out of date"""
+        stamp = self._file_stamp()
+        try:
+            with open(self.index_filename, 'rb') as file:
+                if file.read(len(stamp)) != stamp:
+                    return None
+                offsets = array('Q')
+                offsets.frombytes(file.read())
+                return offsets
+        except FileNotFoundError:
+            return None
+
+    def build_index(self, save=True):
+        """scans file for byte offsets of games, with save=True offsets are saved to index file"""
+        self.offsets = self._scan_offsets()
+        if save:
+            with open(self.index_filename, 'wb') as file:
+                file.write(self._file_stamp())
+                self.offsets.tofile(file)
+        return self.offsets
+
+    def _get_offsets(self):
+        if self.offsets is None:
+            if self.use_index:
+                self.offsets = self._load_index()
+                if self.offsets is None:
+                    self.build_index()
+            else:
+                self.offsets = self._scan_offsets()
+        return self.offsets
+
+    def __len__(self):
+        return len(self._get_offsets())
+
+    def get_text_block(self, index=1):
+        offsets = self._get_offsets()
+        if not 1 <= index <= len(offsets):
+            raise KeyError(index)
+        with open(self.filename, 'rb') as file:
+            file.seek(offsets[index - 1])
+            return '\n'.join(self._read_game_lines(file))
 
     def get_game(self, index=1):
-        if len(self.games) == 0:
-            self._read_file()
-        game_list = self.games[index]
-        return TextBlockReader('\n'.join(game_list)).get_game()
+        return TextBlockReader(self.get_text_block(index), self.geometry).get_game()
 
 
 class TextBlockReader:
 
-    def __init__(self, text_block):
+    def __init__(self, text_block, geometry=None):
         self.text_block = text_block
+        self.geometry = geometry
 
     def get_game(self):
-        from sudoku.structures import Cell
+        from sudoku.structures import Cell, STANDARD
 
+        geometry = self.geometry or STANDARD
         tmp = self.text_block.split('\n')
         lines = [line.strip() for line in tmp if len(line.strip()) > 0]
         cells = []
-        columns = ["a", "b", "c", "", "d", "e", "f", "", "g", "h", "i"]
         for index, item in enumerate(lines):
-            for col_index, cell_value in enumerate(item):
-                if cell_value != '|' and cell_value != '.':
-                    cells.append(Cell(columns[col_index] + str(index + 1), int(cell_value)))
+            symbols = [symbol for symbol in item if symbol != '|']
+            for col_index, symbol in enumerate(symbols):
+                num = geometry.number(symbol)
+                if num:
+                    cells.append(Cell(geometry.columns[col_index] + str(index + 1), num, geometry))
         return cells
 
 
@@ -1,4 +1,19 @@
+from .batch import *
+from .budget import *
+from .benchmark import *
+from .canonical import *
+from .checkpoint import *
 from .cell import *
 from .engine import *
+from .engine_dlx import *
+from .engine_numpy import *
 from .game import *
+from .generator import *
+from .geometry import *
+from .heuristics import *
+from .packed import *
+from .parallel import *
+from .readers import *
+from .service import *
+from .trace import *
 from .tree import *
@@ -0,0 +1,39 @@
+import os
+import unittest
+
+from sudoku.batch import solve_many
+from sudoku.structures import Game
+from sudoku.task_readers import GameFileReader
+
+
+GAMES_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'zadani.txt')
+
+
+class SolveManyTestCase(unittest.TestCase):
+
+    def test_solve_many_from_file_in_current_process(self):
+        results = list(solve_many(GAMES_FILE, workers=1))
+        self.assertEqual([1, 2, 3], [result.index for result in results])
+        for result in results:
+            self.assertTrue(result.solved)
+            self.assertEqual(0, result.game.empty_count)
+            self.assertEqual('', result.game.validate())
+
+    def test_solve_many_in_pool_keeps_input_order(self):
+        games = [Game.create_from_file(GAMES_FILE, index) for index in (3, 1, 2)]
+        results = list(solve_many(games, engine='v2', workers=2, chunksize=1))
+        self.assertEqual([1, 2, 3], [result.index for result in results])
+        for game, result in zip(games, results):
+            self.assertTrue(result.solved)
+            for cell in game.get_input_cells():
+                self.assertEqual(cell.num, result.game.get_cell_value(cell.id))
+
+    def test_solve_many_unordered_returns_all_games(self):
+        reader = GameFileReader(GAMES_FILE)
+        text_blocks = [text_block for _, text_block in reader.iter_text_blocks()]
+        results = list(solve_many(text_blocks, workers=2, ordered=False))
+        self.assertEqual([1, 2, 3], sorted(result.index for result in results))
+
+    def test_solve_many_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            list(solve_many(GAMES_FILE, engine='unknown'))
@@ -0,0 +1,66 @@
+import unittest
+from unittest import mock
+
+from sudoku.benchmark import (run_benchmark, benchmark_corpus, compare_with_baseline, load_corpus, percentile,
+                              solve_one)
+
+
+class BenchmarkTestCase(unittest.TestCase):
+
+    def test_corpora_are_bundled(self):
+        self.assertEqual(10, len(load_corpus('easy')))
+        for cells in load_corpus('minimal'):
+            self.assertEqual(17, len(cells))
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(50, percentile(values, 50))
+        self.assertEqual(99, percentile(values, 99))
+        self.assertEqual(7, percentile([7], 99))
+
+    def test_run_benchmark_report(self):
+        report = run_benchmark(engines=['dlx'], corpora=['easy'], measure_memory=True)
+        self.assertEqual(1, len(report['results']))
+        result = report['results'][0]
+        self.assertEqual(('dlx', 'easy', 10, 10), (result['engine'], result['corpus'], result['puzzles'],
+                                                   result['solved']))
+        self.assertGreater(result['puzzles_per_sec'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertGreater(result['nodes_expanded'], 0)
+        self.assertGreater(result['peak_memory_kb'], 0)
+
+    def test_solve_one_is_stopped_by_timeout(self):
+        cells = load_corpus('hard')[0]
+        status, seconds, _ = solve_one('v1', cells, timeout=0.05)
+        self.assertEqual('timeout', status)
+        self.assertLess(seconds, 1)
+
+    def test_compare_with_baseline(self):
+        report = run_benchmark(engines=['dlx'], corpora=['easy'], measure_memory=False)
+        self.assertEqual([], compare_with_baseline(report, report))
+        faster = {'results': [dict(report['results'][0], puzzles_per_sec=report['results'][0]['puzzles_per_sec'] * 2,
+                                   solved=11)]}
+        regressions = compare_with_baseline(report, faster)
+        self.assertEqual(2, len(regressions))
+        self.assertTrue(regressions[0].startswith('dlx/easy: solved'))
+
+    def test_run_benchmark_with_strategy(self):
+        report = run_benchmark(engines=['v2:degree+lcv'], corpora=['minimal'], measure_memory=False)
+        result = report['results'][0]
+        self.assertEqual(('v2:degree+lcv', 'degree+lcv', 10), (result['engine'], result['strategy'], result['solved']))
+        with self.assertRaises(ValueError):
+            run_benchmark(engines=['dlx:degree+lcv'], corpora=['minimal'])
+
+    def test_game_timed_out_in_any_repeat_is_not_measured(self):
+        games = load_corpus('easy')
+        # first game times out only in first repeat, second one only in last repeat
+        statuses = iter(['timeout', 'solved', 'solved', 'error'] + ['solved'] * 2 * (len(games) - 2))
+
+        def fake_solve_one(engine_name, cells, timeout):
+            return next(statuses), 0.001, 1
+
+        with mock.patch('sudoku.benchmark.solve_one', fake_solve_one), \
+                mock.patch('sudoku.benchmark._peak_memory', return_value=0) as peak_memory:
+            result = benchmark_corpus('dlx', 'easy', repeat=2)
+        self.assertEqual((1, 1), (result['timeouts'], result['errors']))
+        self.assertEqual(games[2:], peak_memory.call_args[0][1])
@@ -0,0 +1,111 @@
+import time
+import unittest
+
+from sudoku.benchmark import load_corpus
+from sudoku.budget import Budget, CancellationToken, BudgetExhaustedException, SOLVED, UNSOLVABLE, BUDGET_EXHAUSTED
+from sudoku.engine_dlx import ExactCoverEngine
+from sudoku.engine_v2 import NumberSearchEngine
+from sudoku.structures import Game, Cell
+
+
+def hard_game():
+    return Game(list(load_corpus('hard')[0]))
+
+
+class CancellingTrace:
+    """trace cancelling token in decision after count decisions, search is cancelled in its step"""
+
+    def __init__(self, token, count):
+        self.token = token
+        self.count = count
+
+    def start(self, game):
+        pass
+
+    def decision(self, parent, children, selected):
+        self.count -= 1
+        if not self.count:
+            self.token.cancel()
+
+    def propagation(self, cells):
+        pass
+
+    def backtrack(self, node):
+        pass
+
+    def end(self, solved):
+        pass
+
+
+class BudgetTestCase(unittest.TestCase):
+
+    def test_check_reasons(self):
+        budget = Budget(max_nodes=10, max_tree_size=5)
+        budget.start()
+        budget.check(10, 5)
+        for args, reason in (((11, 0), 'nodes'), ((0, 6), 'tree_size')):
+            with self.assertRaises(BudgetExhaustedException) as context:
+                budget.check(*args)
+            self.assertEqual(reason, context.exception.reason)
+
+    def test_time_limit_starts_with_solve(self):
+        budget = Budget(time_limit=0)
+        budget.check()
+        budget.start()
+        time.sleep(0.01)
+        with self.assertRaises(BudgetExhaustedException) as context:
+            budget.check()
+        self.assertEqual('time', context.exception.reason)
+
+    def test_solved_within_budget(self):
+        result = NumberSearchEngine(hard_game()).solve(Budget(time_limit=60, max_nodes=100000))
+        self.assertEqual(SOLVED, result.status)
+        self.assertTrue(result.solved)
+        self.assertNotIn(0, result.board)
+        self.assertGreater(result.metrics['nodes_expanded'], 0)
+
+    def test_nodes_exhausted(self):
+        engine = NumberSearchEngine(hard_game())
+        result = engine.solve(Budget(max_nodes=3))
+        self.assertEqual(BUDGET_EXHAUSTED, result.status)
+        self.assertEqual('nodes', result.reason)
+        self.assertEqual(4, result.metrics['nodes_expanded'])
+        self.assertIsNone(engine.budget)
+
+    def test_tree_size_exhausted(self):
+        result = NumberSearchEngine(hard_game()).solve(Budget(max_tree_size=2))
+        self.assertEqual((BUDGET_EXHAUSTED, 'tree_size'), (result.status, result.reason))
+
+    def test_cancelled(self):
+        token = CancellationToken()
+        token.cancel()
+        result = NumberSearchEngine(hard_game()).solve(Budget(token=token))
+        self.assertEqual((BUDGET_EXHAUSTED, 'cancelled'), (result.status, result.reason))
+
+    def test_cancelled_during_search(self):
+        token = CancellationToken()
+        engine = NumberSearchEngine(hard_game(), trace=CancellingTrace(token, 10))
+        result = engine.solve(Budget(token=token))
+        self.assertEqual((BUDGET_EXHAUSTED, 'cancelled'), (result.status, result.reason))
+        self.assertEqual(10, result.metrics['nodes_expanded'])
+        self.assertIn(0, result.board)
+
+    def test_unsolvable_and_invalid(self):
+        game = Game([Cell('a1', 1), Cell('b1', 2), Cell('c1', 3), Cell('d1', 4), Cell('e1', 5),
+                     Cell('f1', 6), Cell('g1', 7), Cell('h1', 8), Cell('i2', 9)])
+        result = NumberSearchEngine(game).solve()
+        self.assertEqual(UNSOLVABLE, result.status)
+        self.assertIsNone(result.reason)
+
+        result = NumberSearchEngine(Game([Cell('a1', 1), Cell('b1', 1)])).solve()
+        self.assertEqual((UNSOLVABLE, 'invalid'), (result.status, result.reason))
+        self.assertEqual('unsolvable', result.as_dict()['status'])
+
+    def test_dlx_budget(self):
+        result = ExactCoverEngine(hard_game()).solve(Budget(max_nodes=2))
+        self.assertEqual((BUDGET_EXHAUSTED, 'nodes'), (result.status, result.reason))
+
+        engine = ExactCoverEngine(hard_game())
+        result = engine.solve(Budget(max_nodes=100000))
+        self.assertEqual(SOLVED, result.status)
+        self.assertEqual(bytes(engine.game.board), result.board)
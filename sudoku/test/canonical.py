@@ -0,0 +1,98 @@
+import itertools
+import random
+import unittest
+
+from sudoku.benchmark import load_corpus
+from sudoku.canonical import canonical_form, SolutionCache, TooManyStatesException
+from sudoku.structures import Game, get_geometry, mask_to_numbers
+
+
+PERMUTATIONS = list(itertools.permutations(range(3)))
+# all orders of columns (rows) allowed by symmetries - order of stacks and order in every stack
+LINE_ORDERS = [tuple(3 * stack + line for stack, perm in zip(stacks, perms) for line in perm)
+               for stacks in PERMUTATIONS
+               for perms in itertools.product(PERMUTATIONS, repeat=3)]
+
+
+def random_transform(board, rnd):
+    if rnd.random() < 0.5:
+        board = [board[9 * col + row] for row in range(9) for col in range(9)]
+    rows, cols = rnd.choice(LINE_ORDERS), rnd.choice(LINE_ORDERS)
+    numbers = list(range(1, 10))
+    rnd.shuffle(numbers)
+    numbers.insert(0, 0)
+    return bytearray(numbers[board[9 * rows[row] + cols[col]]] for row in range(9) for col in range(9))
+
+
+class CanonicalFormTestCase(unittest.TestCase):
+
+    def test_equivalent_games_have_same_canonical_form(self):
+        rnd = random.Random(0)
+        for cells in load_corpus('hard'):
+            board = Game(cells).board
+            canonical, transform = canonical_form(board)
+            self.assertEqual(canonical, bytes(transform.apply(board)))
+            self.assertEqual(board, transform.invert(canonical))
+            for _ in range(3):
+                self.assertEqual(canonical, canonical_form(random_transform(board, rnd))[0])
+
+    def test_different_games_have_different_canonical_forms(self):
+        forms = {canonical_form(Game(cells).board)[0] for cells in load_corpus('easy')}
+        self.assertEqual(len(load_corpus('easy')), len(forms))
+
+    def test_empty_board_has_too_many_states(self):
+        with self.assertRaises(TooManyStatesException):
+            canonical_form(bytes(81))
+
+    def test_only_standard_board(self):
+        with self.assertRaises(ValueError):
+            canonical_form(bytes(16 * 16))
+
+
+class SolutionCacheTestCase(unittest.TestCase):
+
+    def test_other_sizes_are_not_cached(self):
+        cache = SolutionCache()
+        game = Game([], get_geometry(16))
+        solution = cache.solve(game)
+        solved_game = Game.from_board(solution)
+        self.assertEqual(16, solved_game.geometry.size)
+        self.assertEqual(0, solved_game.empty_count)
+        self.assertTrue(solved_game.is_valid())
+        self.assertEqual((1, 0, 0), (cache.skipped, cache.misses, len(cache)))
+
+    def test_equivalent_game_is_solved_from_cache(self):
+        cache = SolutionCache()
+        game = Game(load_corpus('minimal')[0])
+        solution = cache.solve(game)
+        other = Game.from_board(random_transform(game.board, random.Random(1)))
+        other_solution = cache.solve(other)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+        for board, solved in ((game.board, solution), (other.board, other_solution)):
+            solved_game = Game.from_board(solved)
+            self.assertEqual(0, solved_game.empty_count)
+            self.assertTrue(solved_game.is_valid())
+            self.assertTrue(all(num == solved[index] for index, num in enumerate(board) if num))
+
+    def test_least_recently_used_is_removed(self):
+        cache = SolutionCache(maxsize=2)
+        games = [Game(cells) for cells in load_corpus('easy')[:3]]
+        for game in games + games[2:]:
+            cache.solve(game)
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.hits)
+        cache.solve(games[0])
+        self.assertEqual(4, cache.misses)
+
+    def test_game_without_solution(self):
+        cache = SolutionCache()
+        game = Game(load_corpus('easy')[0])
+        solution = cache.solve(game)
+        # other candidate than number of only solution
+        index = next(index for index in game.empty_indexes() if len(mask_to_numbers(game.candidates_mask_at(index))) > 1)
+        board = bytearray(game.board)
+        board[index] = next(num for num in mask_to_numbers(game.candidates_mask_at(index)) if num != solution[index])
+        unsolvable = Game.from_board(board)
+        self.assertEqual([None, None], [cache.solve(unsolvable) for _ in range(2)])
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
@@ -1,5 +1,5 @@
 import unittest
-from sudoku.structures import Cell
+from sudoku.structures import Cell, CELL_IDS, ROW_OF, COL_OF, SQUARE_OF, PEERS
 
 __all__ = (
     'CellTestCase',
@@ -18,9 +18,23 @@ class CellTestCase(unittest.TestCase):
         self.assertEqual(9, cell2.row)
         self.assertEqual(9, cell2.square)
 
+    def test_cell_coordinates_are_plain_attributes(self):
+        cell = Cell('e5', 7)
+        self.assertEqual(40, cell.index)
+        self.assertEqual(5, cell.square)
+        self.assertFalse(hasattr(cell, '__dict__'))
+
     def test_cell_are_equal(self):
         cell = Cell('a1')
         cell2 = Cell('a1')
         cell3 = Cell('i9')
         self.assertEqual(cell, cell2)
         self.assertNotEqual(cell, cell3)
+
+    def test_board_tables_match_cell_coordinates(self):
+        for index, ident in enumerate(CELL_IDS):
+            cell = Cell(ident)
+            self.assertEqual(cell.row, ROW_OF[index] + 1)
+            self.assertEqual(cell.col, "abcdefghi"[COL_OF[index]])
+            self.assertEqual(cell.square, SQUARE_OF[index] + 1)
+            self.assertEqual(20, len(PEERS[index]))
@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from sudoku.benchmark import load_corpus
+from sudoku.budget import Budget, BudgetExhaustedException
+from sudoku.checkpoint import Checkpoint, load, resume, snapshot
+from sudoku.engine_v2 import NumberSearchEngine
+from sudoku.structures import Game
+
+
+def interrupt(engine, search, max_nodes):
+    """runs search (method of engine) until budget of nodes is exhausted, like preempted worker"""
+    engine.budget = Budget(max_nodes=max_nodes)
+    engine.budget.start()
+    try:
+        search()
+    except BudgetExhaustedException:
+        return
+    raise AssertionError('Search was not interrupted')
+
+
+class CheckpointTestCase(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.filename = tempfile.mkstemp(suffix='.json.gz')
+        os.close(handle)
+        # hard game without first input number has 292 solutions
+        self.cells = load_corpus('hard')[0][1:]
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def _assert_resumed_count(self, compact_tree):
+        reference = NumberSearchEngine(Game(list(self.cells)), True, compact_tree=compact_tree)
+        count = reference.count_solutions(1000)
+
+        checkpoint = Checkpoint(self.filename, interval=None, nodes=200)
+        engine = NumberSearchEngine(Game(list(self.cells)), True, compact_tree=compact_tree,
+                                    checkpoint=checkpoint)
+        interrupt(engine, lambda: engine.count_solutions(1000), 700)
+        self.assertEqual(3, checkpoint.saved)
+
+        resumed = resume(self.filename)
+        self.assertEqual(600, resumed.metrics.nodes_expanded)
+        self.assertGreater(resumed.solutions_found, 0)
+        self.assertEqual(count, resumed.count_solutions(1000))
+        self.assertEqual(reference.metrics.nodes_expanded, resumed.metrics.nodes_expanded)
+        self.assertEqual(reference.metrics.backtracks, resumed.metrics.backtracks)
+
+    def test_resumed_count_of_solutions(self):
+        self._assert_resumed_count(False)
+
+    def test_resumed_count_of_solutions_with_compact_tree(self):
+        self._assert_resumed_count(True)
+
+    def test_resumed_solve(self):
+        cells = load_corpus('hard')[0]
+        reference = NumberSearchEngine(Game(list(cells)), strategy='degree')
+        reference.find_numbers()
+
+        engine = NumberSearchEngine(Game(list(cells)), strategy='degree',
+                                    checkpoint=Checkpoint(self.filename, interval=None, nodes=100))
+        interrupt(engine, engine.find_numbers, reference.metrics.nodes_expanded // 2)
+
+        resumed = resume(self.filename, checkpoint=Checkpoint(self.filename, interval=None, nodes=100))
+        self.assertEqual('degree+smallest', resumed.strategy.name)
+        self.assertTrue(resumed.find_numbers())
+        self.assertEqual(reference.game.compressed(), resumed.game.compressed())
+        self.assertEqual(reference.metrics.nodes_expanded, resumed.metrics.nodes_expanded)
+        self.assertEqual([cell.id for cell in Game(list(cells)).get_input_cells()],
+                         [cell.id for cell in resumed.game.get_input_cells()])
+
+    def test_snapshot_keeps_only_open_part_of_tree(self):
+        engine = NumberSearchEngine(Game(list(self.cells)), True)
+        interrupt(engine, lambda: engine.count_solutions(1000), 700)
+        state = snapshot(engine)
+
+        def count(states):
+            return sum(1 + count(children) for _, _, _, children in states)
+
+        self.assertLess(count(state['tree']), engine.tree.size)
+        self.assertEqual(list(engine.tree.get_current().path), state['current'])
+
+    def test_unknown_version(self):
+        with gzip.open(self.filename, 'wt', encoding='utf-8') as file:
+            json.dump({'version': 0}, file)
+        with self.assertRaises(ValueError):
+            load(self.filename)
@@ -1,7 +1,11 @@
+import contextlib
+import io
 import unittest
 
 from sudoku.structures import Game, Cell
-from sudoku.engine_v2 import NumberSearchEngine, EmptyCellsWithNoChoicesException
+from sudoku.engine_dlx import ExactCoverEngine
+from sudoku.engine_v2 import NumberSearchEngine, EmptyCellsWithNoChoicesException, count_solutions, \
+    iter_solutions
 from sudoku.task_readers import TextBlockReader
 
 
@@ -17,6 +21,23 @@ GAME_1 = """
     9..|.17|..6|
     """
 
+GAME_3 = """
+    ...|..7|..1
+    .8.|6..|75.
+    6..|..9|8..
+    .98|.6.|...
+    .43|591|28.
+    ...|.3.|49.
+    ..5|1..|..7
+    .17|..6|.3.
+    8..|2..|...
+    """
+
+# GAME_1 without three numbers, 24 solutions
+GAME_MORE_SOLUTIONS = (GAME_1.replace('8..|94.|..5|', '...|94.|..5|')
+                       .replace('1.9|6.2|...|', '1..|6.2|...|')
+                       .replace('9..|.17|..6|', '...|.17|..6|'))
+
 
 class NumberSearchEngineTestCase(unittest.TestCase):
 
@@ -104,20 +125,105 @@ class NumberSearchEngineTestCase(unittest.TestCase):
         self.assertEqual(0, len(engine.game_archive))
         engine.find_numbers(False)
         self._print_tree(engine)
-        old_game = engine.game
+        old_last_cell = engine.game.get_last_cell()
         old_current = engine.tree.get_current()
         engine.create_new_game_plan_to_continue()
         new_game = engine.game
         new_current = engine.tree.get_current()
         self._print_tree(engine)
-        self.assertNotEqual(old_game.cells[len(old_game.cells)-1], new_game.cells[len(new_game.cells)-1])
+        self.assertNotEqual(old_last_cell, new_game.get_last_cell())
+        self.assertEqual(new_current.id[:2], new_game.get_last_cell().id)
         self.assertNotEqual(old_current, new_current)
 
+    def test_engine_propagate_fills_singles_without_branching(self):
+        game = Game(TextBlockReader(GAME_3).get_game())
+        engine = NumberSearchEngine(game, propagate_singles=True)
+        empty_count = game.empty_count
+        self.assertEqual(empty_count, engine.propagate())
+        self.assertEqual(0, game.empty_count)
+        self.assertEqual('', game.validate())
+        self.assertTrue(engine.find_numbers())
+        self.assertEqual(0, len(engine.tree))
+
+    def test_engine_propagate_detects_contradiction(self):
+        game = Game(TextBlockReader(self.GAME_2).get_game())
+        engine = NumberSearchEngine(game, propagate_singles=True)
+        with self.assertRaises(EmptyCellsWithNoChoicesException):
+            engine.propagate()
+
+    def test_engine_solve_whole_game_with_propagation(self):
+        game = Game(TextBlockReader(GAME_1).get_game())
+        engine = NumberSearchEngine(game, propagate_singles=True)
+        self.assertTrue(engine.find_numbers())
+        self.assertEqual(engine.game.filled_count, 81)
+        self.assertEqual(engine.game.validate(), '')
+        self.assertGreater(engine.metrics.propagations, 0)
+        self.assertGreater(engine.metrics.backtracks, 0)
+        self.assertGreater(engine.metrics.nodes_expanded, engine.metrics.backtracks)
+        self.assertGreater(engine.metrics.max_depth, 0)
+        self.assertGreater(engine.metrics.candidate_computations, 0)
+        self.assertIn('total', engine.metrics.phase_times)
+
+    def test_engine_is_silent(self):
+        game = Game(TextBlockReader(GAME_1).get_game())
+        engine = NumberSearchEngine(game, propagate_singles=True)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            engine.find_numbers()
+        self.assertEqual('', output.getvalue())
+
+    def test_count_solutions_of_unique_game(self):
+        game = Game(TextBlockReader(GAME_1).get_game())
+        self.assertEqual(1, count_solutions(game))
+        self.assertEqual(1, count_solutions(game, propagate_singles=False))
+        self.assertEqual([], game.get_solution_cells())
+
+    def test_count_solutions_stops_at_limit(self):
+        game = Game(TextBlockReader(GAME_MORE_SOLUTIONS).get_game())
+        self.assertEqual(24, ExactCoverEngine(game.copy()).count_solutions(limit=100))
+        self.assertEqual(24, count_solutions(game, limit=100))
+        self.assertEqual(24, count_solutions(game, limit=100, propagate_singles=False))
+        self.assertEqual(2, count_solutions(game))
+
+    def test_count_solutions_of_game_without_solution(self):
+        game = Game(TextBlockReader(self.GAME_2).get_game())
+        self.assertEqual(0, count_solutions(game))
+
+    def test_iter_solutions_yields_different_valid_solutions(self):
+        game = Game(TextBlockReader(GAME_MORE_SOLUTIONS).get_game())
+        solutions = list(iter_solutions(game))
+        self.assertEqual(24, len(solutions))
+        self.assertEqual(len(solutions), len(set(tuple(s.compressed()) for s in solutions)))
+        for solution in solutions:
+            self.assertEqual(0, solution.empty_count)
+            self.assertTrue(solution.is_valid())
+
+    def test_compact_tree_keeps_only_current_path_and_open_alternatives(self):
+        game = Game(TextBlockReader(GAME_1).get_game())
+        engine = NumberSearchEngine(game, compact_tree=True)
+        self.assertTrue(engine.find_numbers())
+        self.assertEqual(game.validate(), '')
+        nodes = list(engine.tree.walk_through_nodes_deep_first())
+        path = engine.tree.get_current().path
+        self.assertEqual(len(path), engine.tree.get_current().depth + 1)
+        for node in nodes:
+            self.assertTrue(node.id in path or not node.done)
+        full_engine = NumberSearchEngine(Game(TextBlockReader(GAME_1).get_game()))
+        full_engine.find_numbers()
+        self.assertEqual(full_engine.game.compressed(), game.compressed())
+        self.assertLess(len(nodes), len(list(full_engine.tree.walk_through_nodes_deep_first())))
+
+    def test_compact_tree_counts_solutions(self):
+        game = Game(TextBlockReader(GAME_MORE_SOLUTIONS).get_game())
+        engine = NumberSearchEngine(game, propagate_singles=True, compact_tree=True)
+        self.assertEqual(24, engine.count_solutions(limit=100))
+        nodes = list(engine.tree.walk_through_nodes_deep_first())
+        self.assertEqual(len(engine.tree.get_current().path), len(nodes))
+
     def _print_tree(self, engine):
         all_nodes = list(engine.tree.walk_through_nodes_breadth_first(add_separators=True))
         print(','.join(n.id for n in all_nodes) + '\n')
 
-    @unittest.skip('not done')
     def test_engine_try_to_solve_whole_game(self):
         game = Game(TextBlockReader(GAME_1).get_game())
         engine = NumberSearchEngine(game)
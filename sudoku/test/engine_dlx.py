@@ -0,0 +1,64 @@
+import unittest
+
+from sudoku.structures import Game
+from sudoku.engine_dlx import ExactCoverEngine
+from sudoku.engine_v2 import NumberSearchEngine
+from sudoku.task_readers import TextBlockReader
+
+
+GAME_1 = """
+    8..|94.|..5|
+    ...|.5.|2..|
+    1.9|6.2|...|
+    5.1|...|..4|
+    46.|...|.53|
+    2..|...|8.1|
+    ...|4.9|1.7|
+    ..4|.6.|...|
+    9..|.17|..6|
+    """
+
+# 17 given numbers
+GAME_MINIMAL = """
+    ...|...|.1.
+    4..|...|...
+    .2.|...|...
+    ...|.5.|4.7
+    ..8|...|3..
+    ..1|.9.|...
+    3..|4..|2..
+    .5.|1..|...
+    ...|8.6|...
+    """
+
+
+class ExactCoverEngineTestCase(unittest.TestCase):
+
+    def test_engine_solves_game_same_as_number_search_engine(self):
+        game = Game(TextBlockReader(GAME_1).get_game())
+        self.assertTrue(ExactCoverEngine(game).find_numbers())
+        self.assertEqual(81, game.filled_count)
+        self.assertEqual('', game.validate())
+        other_game = Game(TextBlockReader(GAME_1).get_game())
+        NumberSearchEngine(other_game, propagate_singles=True).find_numbers()
+        self.assertEqual(other_game.compressed(), game.compressed())
+
+    def test_engine_solves_minimal_game(self):
+        game = Game(TextBlockReader(GAME_MINIMAL).get_game())
+        self.assertEqual(17, game.filled_count)
+        engine = ExactCoverEngine(game)
+        self.assertEqual(1, engine.count_solutions())
+        self.assertTrue(engine.find_numbers())
+        self.assertEqual(0, game.empty_count)
+        self.assertEqual('', game.validate())
+
+    def test_engine_game_with_duplicate_numbers_has_no_solution(self):
+        game = Game(TextBlockReader(GAME_1.replace('8..|94.', '8.8|94.')).get_game())
+        engine = ExactCoverEngine(game)
+        self.assertEqual(0, engine.count_solutions())
+        self.assertFalse(engine.find_numbers())
+
+    def test_engine_counts_more_solutions(self):
+        game = Game(TextBlockReader(GAME_MINIMAL.replace('.1.', '...', 1)).get_game())
+        self.assertEqual(2, ExactCoverEngine(game).count_solutions(limit=2))
+        self.assertEqual(5, ExactCoverEngine(game).count_solutions(limit=5))
@@ -0,0 +1,54 @@
+import os
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from sudoku.benchmark import load_corpus
+from sudoku.structures import Game
+
+if numpy:
+    from sudoku.engine_numpy import NumpyBatchEngine, solve_batch, propagate_boards, SOLVED, CONTRADICTION, OPEN
+
+
+GAMES_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'zadani.txt')
+
+
+@unittest.skipUnless(numpy, 'numpy is not installed')
+class NumpyBatchEngineTestCase(unittest.TestCase):
+
+    def test_propagate_boards(self):
+        easy = Game(load_corpus('easy')[1]).board
+        hard = Game(load_corpus('hard')[0]).board
+        invalid = bytearray(easy)
+        index = invalid.index(0)
+        invalid[index] = next(num for num in easy[index - index % 9:index - index % 9 + 9] if num)
+        boards = numpy.array([list(board) for board in (easy, hard, invalid, bytes(81))], dtype=numpy.int8)
+        status, rounds = propagate_boards(boards)
+        self.assertEqual([SOLVED, OPEN, CONTRADICTION, OPEN], status.tolist())
+        self.assertTrue(rounds > 1)
+        self.assertEqual(0, (boards[0] == 0).sum())
+        self.assertTrue(Game.from_board(bytes(boards[0])).is_valid())
+
+    def test_find_numbers(self):
+        games = [Game(cells) for name in ('easy', 'hard', 'minimal') for cells in load_corpus(name)]
+        inputs = [game.copy() for game in games]
+        engine = NumpyBatchEngine(games)
+        self.assertTrue(all(engine.find_numbers()))
+        self.assertTrue(0 < engine.handed_off < len(games))
+        for game, original in zip(games, inputs):
+            self.assertEqual(0, game.empty_count)
+            self.assertTrue(game.is_valid())
+            self.assertEqual(len(original.get_input_cells()), len(game.get_input_cells()))
+            self.assertTrue(all(game.board[cell.index] == cell.num for cell in original.get_input_cells()))
+
+    def test_solve_batch_from_file(self):
+        results = list(solve_batch(GAMES_FILE, engine='v2', batch_size=2))
+        self.assertEqual([1, 2, 3], [result.index for result in results])
+        self.assertTrue(all(result.solved and result.game.empty_count == 0 for result in results))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            NumpyBatchEngine([], engine='unknown')
@@ -108,6 +108,38 @@ class GameStatusTestCase(unittest.TestCase):
         game = Game(TextBlockReader(game_block).get_game())
         self.assertEqual('rcs', game.validate())
 
+    def test_validate_detailed_returns_conflicting_cells(self):
+        game_block = """
+                3.1|..2|..3
+                ..4|..5|..6
+                .17|..8|..9
+                .1.|.2.|.3.
+                .4.|.5.|.6.
+                .7.|.8.|.9.
+                1..|2..|3..
+                4..|5..|6..
+                7..|8..|9..
+                """
+        game = Game(TextBlockReader(game_block).get_game())
+        cells = game.validate(detailed=True)
+        self.assertEqual(['a1', 'c1', 'i1', 'b3', 'b4'], [cell.id for cell in cells])
+        self.assertEqual([3, 1, 3, 1, 1], [cell.num for cell in cells])
+
+    def test_validity_is_updated_after_each_move(self):
+        game = Game(TextBlockReader(GAME_1).get_game())
+        self.assertTrue(game.is_valid())
+        self.assertEqual([], game.validate(detailed=True))
+        game.add_cell(Cell('b1', 3))
+        game.add_cell(Cell('c1', 3))
+        self.assertFalse(game.is_valid())
+        self.assertEqual('rs', game.validate())
+        self.assertEqual(['b1', 'c1'], [cell.id for cell in game.validate(detailed=True)])
+        game.undo(1)
+        self.assertTrue(game.is_valid())
+        self.assertEqual([2, 6, 7], game.candidates(Cell('c1')))
+        game.undo()
+        self.assertEqual([2, 3, 6, 7], game.candidates(Cell('c1')))
+
     def test_get_formatted_solution_cells(self):
         game = Game(TextBlockReader(GAME_1).get_game())
         game.add_cell(Cell('b1', 5))
@@ -126,4 +158,34 @@ class GameStatusTestCase(unittest.TestCase):
         self.assertEqual(len(orig_game.cells), len(new_game.cells))
         for index, cell in enumerate(orig_game.cells):
             self.assertEqual(cell, new_game.cells[index])
-            self.assertEqual(cell.num, new_game.cells[index].num)
\ No newline at end of file
+            self.assertEqual(cell.num, new_game.cells[index].num)
+
+    def test_candidates_are_updated_after_add_cell(self):
+        game = Game(TextBlockReader(GAME_1).get_game())
+        self.assertEqual([2, 3, 7], game.candidates(Cell('b1')))
+        game.add_cell(Cell('c1', 3))
+        self.assertEqual([2, 7], game.candidates(Cell('b1')))
+        self.assertEqual([1], game.candidates(Cell('f1')))
+
+    def test_compressed(self):
+        game = Game(TextBlockReader(GAME_1).get_game())
+        game.add_cell(Cell('b1', 3))
+        lst = game.compressed()
+        self.assertEqual(9, len(lst))
+        self.assertEqual('83.94...5', lst[0])
+        self.assertEqual('9...17..6', lst[8])
+
+    def test_undo_removes_solution_cells_added_after_mark(self):
+        game = Game(TextBlockReader(GAME_1).get_game())
+        input_count = len(game.cells)
+        game.add_cell(Cell('b1', 3))
+        game.add_cell(Cell('c1', 2))
+        game.add_cell(Cell('f1', 1))
+        self.assertEqual(2, game.undo(1))
+        self.assertEqual('b1=3', game.get_formatted_solution_cells())
+        self.assertEqual(input_count + 1, len(game.cells))
+        self.assertIsNone(game.get_cell_value('c1'))
+        self.assertEqual([1], game.candidates(Cell('f1')))
+        game.undo()
+        self.assertEqual(input_count, len(game.cells))
+        self.assertEqual([2, 3, 7], game.candidates(Cell('b1')))
@@ -0,0 +1,45 @@
+import unittest
+
+from sudoku.engine_dlx import ExactCoverEngine
+from sudoku.generator import GameGenerator, generate_many, symmetry_groups
+from sudoku.structures import Game
+from sudoku.task_readers import TextBlockReader
+from sudoku.utils import GameFormatter
+
+
+class GameGeneratorTestCase(unittest.TestCase):
+
+    def test_generated_game_has_one_solution(self):
+        game = GameGenerator().generate(seed=1)
+        self.assertTrue(game.is_valid())
+        self.assertLess(game.filled_count, 30)
+        self.assertEqual(1, ExactCoverEngine(game).count_solutions())
+
+    def test_generate_is_deterministic(self):
+        first = GameGenerator(solver='v2').generate(seed=7)
+        second = GameGenerator(solver='v2').generate(seed=7)
+        self.assertEqual(first.compressed(), second.compressed())
+
+    def test_generate_keeps_symmetry_and_target_clues(self):
+        game = GameGenerator(symmetry='rotational', target_clues=36).generate(seed=3)
+        self.assertIn(game.filled_count, (36, 37))
+        for index in range(81):
+            self.assertEqual(bool(game.board[index]), bool(game.board[80 - index]))
+
+    def test_symmetry_groups_cover_board(self):
+        for symmetry in ('none', 'rotational', 'mirror', 'diagonal'):
+            groups = symmetry_groups(symmetry)
+            self.assertEqual(list(range(81)), sorted(index for group in groups for index in group))
+        with self.assertRaises(ValueError):
+            symmetry_groups('spiral')
+
+    def test_generate_many_does_not_depend_on_workers(self):
+        games = generate_many(3, seed=10, workers=1)
+        other_games = generate_many(3, seed=10, workers=2)
+        self.assertEqual([g.compressed() for g in games], [g.compressed() for g in other_games])
+        self.assertEqual(3, len({tuple(g.compressed()) for g in games}))
+
+    def test_text_block_can_be_read(self):
+        game = GameGenerator().generate(seed=2)
+        text_block = GameFormatter(game).text_block()
+        self.assertEqual(game.compressed(), Game(TextBlockReader(text_block).get_game()).compressed())
@@ -0,0 +1,158 @@
+import os
+import pickle
+import random
+import tempfile
+import unittest
+
+from sudoku.engine_dlx import ExactCoverEngine
+from sudoku.engine_v2 import NumberSearchEngine
+from sudoku.structures import Game, Cell, get_geometry, STANDARD, CELL_IDS, SQUARE_OF
+from sudoku.task_readers import GameFileReader, TextBlockReader
+from sudoku.trace import TraceWriter, TraceReplayer
+from sudoku.utils import GameFormatter
+
+
+GAME_4 = """
+    1.|..
+    ..|2.
+
+    .3|..
+    ..|.4
+    """
+
+
+def create_game(size, removed_percent, seed=0):
+    """game with unique or more solutions - part of cells removed from solved board"""
+    geometry = get_geometry(size)
+    full = Game([], geometry)
+    NumberSearchEngine(full, propagate_singles=True).find_numbers()
+    board = bytearray(full.board)
+    for index in random.Random(seed).sample(range(geometry.cell_count), geometry.cell_count * removed_percent // 100):
+        board[index] = 0
+    return Game.from_board(board)
+
+
+class GeometryTestCase(unittest.TestCase):
+
+    def test_standard_geometry(self):
+        self.assertIs(STANDARD, get_geometry(9))
+        self.assertEqual(CELL_IDS, STANDARD.cell_ids)
+        self.assertEqual(SQUARE_OF, STANDARD.square_of)
+        self.assertEqual(0b1111111110, STANDARD.all_numbers_mask)
+
+    def test_geometry_16(self):
+        geometry = get_geometry(16)
+        self.assertEqual((4, 256), (geometry.box, geometry.cell_count))
+        self.assertEqual('p16', geometry.cell_ids[-1])
+        self.assertEqual(15, geometry.square_of[geometry.cell_index['p16']])
+        self.assertEqual(3 * 16, len(geometry.units))
+        self.assertEqual(3 * 15 - 2 * 3, len(geometry.peers[0]))
+        self.assertEqual(('.', 'G'), (geometry.symbol(0), geometry.symbol(16)))
+        self.assertEqual((0, 10, 16), (geometry.number('.'), geometry.number('A'), geometry.number('g')))
+        with self.assertRaises(ValueError):
+            geometry.number('H')
+
+    def test_line_pattern_accepts_symbols_of_number(self):
+        geometry = get_geometry(16)
+        for line in ('1.A.|b..g|....|...C|', '1.a.|B..G|....|...c'):
+            self.assertTrue(geometry.line_pattern.match(line))
+            self.assertEqual([1, 0, 10, 0], [geometry.number(symbol) for symbol in line[:4]])
+        self.assertFalse(geometry.line_pattern.match('1.h.|b..g|....|...c'))
+
+    def test_pickled_game_shares_geometry(self):
+        self.assertLess(len(pickle.dumps(get_geometry(16))), 100)
+        game = create_game(16, 50)
+        copy = pickle.loads(pickle.dumps(game))
+        self.assertIs(game.geometry, copy.geometry)
+        self.assertIs(STANDARD, pickle.loads(pickle.dumps(Game([]))).geometry)
+
+    def test_unsupported_size(self):
+        with self.assertRaises(ValueError):
+            get_geometry(10)
+        with self.assertRaises(ValueError):
+            get_geometry(36)
+
+    def test_cell_with_two_digit_row(self):
+        cell = Cell('p12', 16, get_geometry(16))
+        self.assertEqual((12, 'p', 12, 191), (cell.row, cell.col, cell.square, cell.index))
+
+
+class GeometryReadersTestCase(unittest.TestCase):
+
+    def test_text_block_4(self):
+        geometry = get_geometry(4)
+        game = Game(TextBlockReader(GAME_4, geometry).get_game(), geometry)
+        self.assertEqual(['1...', '..2.', '.3..', '...4'], game.compressed())
+        self.assertEqual('1.|..\n..|2.\n\n.3|..\n..|.4', GameFormatter(game).text_block())
+
+    def test_text_block_16_round_trip(self):
+        game = create_game(16, 50)
+        text_block = GameFormatter(game).text_block()
+        self.assertIn('G', text_block)
+        read = Game(TextBlockReader(text_block, game.geometry).get_game(), game.geometry)
+        self.assertEqual(game.board, read.board)
+
+    def test_games_file_16(self):
+        games = [create_game(16, 50, seed) for seed in range(2)]
+        handle, filename = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(handle, 'w') as file:
+            for game in games:
+                file.write('----------\n' + GameFormatter(game).text_block() + '\n')
+        try:
+            reader = GameFileReader(filename, geometry=games[0].geometry)
+            self.assertEqual(2, len(reader))
+            for (index, cells), game in zip(reader.iter_games(), games):
+                self.assertEqual(game.board, Game(cells, game.geometry).board)
+            self.assertEqual(games[1].board, Game.create_from_file(filename, 2, games[1].geometry).board)
+        finally:
+            os.remove(filename)
+
+
+class GeometryEnginesTestCase(unittest.TestCase):
+
+    def _assert_solved(self, game, original):
+        self.assertEqual(0, game.empty_count)
+        self.assertTrue(game.is_valid())
+        for index, num in enumerate(original.board):
+            if num:
+                self.assertEqual(num, game.board[index])
+
+    def test_engines_4(self):
+        geometry = get_geometry(4)
+        original = Game(TextBlockReader(GAME_4, geometry).get_game(), geometry)
+        for game in (original.copy(), original.copy()):
+            self.assertTrue(NumberSearchEngine(game).find_numbers())
+            self._assert_solved(game, original)
+        game = original.copy()
+        self.assertTrue(ExactCoverEngine(game).find_numbers())
+        self._assert_solved(game, original)
+
+    def test_engines_16(self):
+        original = create_game(16, 55)
+        game = original.copy()
+        self.assertTrue(NumberSearchEngine(game, propagate_singles=True).find_numbers())
+        self._assert_solved(game, original)
+        game = original.copy()
+        self.assertTrue(ExactCoverEngine(game).find_numbers())
+        self._assert_solved(game, original)
+
+    def test_engine_25(self):
+        original = create_game(25, 40)
+        game = original.copy()
+        self.assertTrue(NumberSearchEngine(game, propagate_singles=True).find_numbers())
+        self._assert_solved(game, original)
+
+    def test_trace_replay_16(self):
+        handle, filename = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+        try:
+            game = create_game(16, 60, seed=3)
+            with TraceWriter(filename) as trace:
+                engine = NumberSearchEngine(game, propagate_singles=True, trace=trace)
+                self.assertTrue(engine.find_numbers())
+            replayer = TraceReplayer(filename)
+            _, replayed = replayer.replay()
+            self.assertIs(game.geometry, replayed.geometry)
+            self.assertEqual(game.compressed(), replayed.compressed())
+        finally:
+            os.remove(filename)
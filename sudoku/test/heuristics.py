@@ -0,0 +1,58 @@
+import unittest
+
+from sudoku.benchmark import load_corpus
+from sudoku.engine_v2 import NumberSearchEngine
+from sudoku.heuristics import BranchingStrategy, STRATEGIES
+from sudoku.structures import Game
+
+
+class BranchingStrategyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.game = Game(list(load_corpus('hard')[0]))
+        self.found_cells = NumberSearchEngine(self.game)._find_empty_cells_with_smallest_choice()
+
+    def test_strategy_names(self):
+        self.assertEqual('first+smallest', BranchingStrategy().name)
+        self.assertEqual('degree+smallest', BranchingStrategy.from_name('degree').name)
+        self.assertEqual(9, len(STRATEGIES))
+        with self.assertRaises(ValueError):
+            BranchingStrategy.from_name('first+largest')
+
+    def test_degree_selects_cell_with_most_empty_peers(self):
+        def degree(found):
+            return sum(1 for index in self.game.geometry.peers[found.cell.index] if not self.game.board[index])
+
+        found = BranchingStrategy('degree').choose(self.game, list(self.found_cells))
+        self.assertEqual(max(degree(found) for found in self.found_cells), degree(found))
+
+    def test_random_selection_is_repeatable_with_seed(self):
+        chosen = [BranchingStrategy('random', seed=1).choose(self.game, list(self.found_cells)).cell.id
+                  for _ in range(2)]
+        self.assertEqual(chosen[0], chosen[1])
+
+    def test_value_orders_keep_choices(self):
+        for value_order in ('smallest', 'lcv', 'frequency'):
+            found = self.found_cells[0]
+            choices = sorted(found.choices)
+            ordered = BranchingStrategy('first', value_order).choose(self.game, [found]).choices
+            self.assertEqual(choices, sorted(ordered))
+
+    def test_least_constraining_value_first(self):
+        game = self.game
+        found = self.found_cells[0]
+        peers = [peer for peer in game.geometry.peers[found.cell.index] if not game.board[peer]]
+
+        def removed(num):
+            return sum(1 for peer in peers if game.candidates_mask_at(peer) & (1 << num))
+
+        ordered = BranchingStrategy('first', 'lcv').choose(game, [found]).choices
+        self.assertEqual(sorted(removed(num) for num in ordered), [removed(num) for num in ordered])
+
+    def test_engine_solves_with_every_strategy(self):
+        for strategy in STRATEGIES:
+            game = Game(list(load_corpus('hard')[1]))
+            engine = NumberSearchEngine(game, propagate_singles=True, strategy=strategy)
+            self.assertTrue(engine.find_numbers())
+            self.assertEqual((0, True), (game.empty_count, game.is_valid()))
+            self.assertEqual(strategy, engine.metrics.as_dict()['strategy'])
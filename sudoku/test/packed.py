@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+from sudoku.benchmark import CORPORA_DIRECTORY
+from sudoku.packed import PackedGameReader, PackedGameWriter, convert_text_file, pack_board, unpack_board
+from sudoku.structures import Game
+from sudoku.task_readers import GameFileReader
+
+
+class PackedGamesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, 'games.sdkp')
+        self.source = os.path.join(CORPORA_DIRECTORY, 'easy.txt')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_pack_and_unpack_board(self):
+        board = bytearray(n % 10 for n in range(81))
+        packed = pack_board(board)
+        self.assertEqual(41, len(packed))
+        self.assertEqual(board, unpack_board(packed))
+
+    def test_convert_text_file_keeps_games(self):
+        self.assertEqual(10, convert_text_file(self.source, self.filename))
+        self.assertEqual(12 + 10 * 41, os.path.getsize(self.filename))
+        games = [Game(cells) for _, cells in GameFileReader(self.source).iter_games()]
+        with PackedGameReader(self.filename) as reader:
+            self.assertEqual(10, len(reader))
+            self.assertFalse(reader.with_solutions)
+            self.assertIsNone(reader.get_solution_board(0))
+            self.assertEqual(games[7].compressed(), reader.get_game(7).compressed())
+            self.assertEqual([g.compressed() for g in games], [g.compressed() for g in reader])
+            with self.assertRaises(IndexError):
+                reader.record(10)
+
+    def test_convert_text_file_with_solutions(self):
+        convert_text_file(self.source, self.filename, with_solutions=True)
+        with PackedGameReader(self.filename) as reader:
+            self.assertTrue(reader.with_solutions)
+            board = reader.get_board(3)
+            solution = reader.get_solution_board(3)
+            self.assertEqual(0, solution.count(0))
+            for index in range(81):
+                if board[index]:
+                    self.assertEqual(board[index], solution[index])
+            self.assertTrue(Game.from_board(solution).is_valid())
+
+    def test_writer_requires_solution(self):
+        with PackedGameWriter(self.filename, with_solutions=True) as writer:
+            with self.assertRaises(ValueError):
+                writer.write(bytes(81))
+
+    def test_reader_rejects_other_file(self):
+        with open(self.filename, 'wb') as file:
+            file.write(b'not packed games')
+        with self.assertRaises(ValueError):
+            PackedGameReader(self.filename)
@@ -0,0 +1,112 @@
+import unittest
+
+from sudoku.benchmark import load_corpus
+from sudoku.budget import Budget, SOLVED, UNSOLVABLE, BUDGET_EXHAUSTED
+from sudoku.engine_v2 import NumberSearchEngine
+from sudoku.parallel import ParallelSearch, split_game, assign, solve_parallel
+from sudoku.structures import Game, Cell
+
+
+def solution(cells):
+    engine = NumberSearchEngine(Game(list(cells)), propagate_singles=True)
+    engine.find_numbers()
+    return bytes(engine.game.board)
+
+
+def game_with_solution_cells(cells, count):
+    """game with count correct solution cells added to input cells"""
+    solved = solution(cells)
+    game = Game(list(cells))
+    geometry = game.geometry
+    for index in game.empty_indexes()[:count]:
+        game.add_cell(Cell(geometry.cell_ids[index], solved[index], geometry))
+    return game
+
+
+class SplitGameTestCase(unittest.TestCase):
+
+    def test_leaves_are_partial_assignments(self):
+        cells = load_corpus('hard')[0]
+        game = Game(list(cells))
+        tree, leaves = split_game(game, 8)
+        self.assertGreaterEqual(len(leaves), 8)
+        self.assertEqual(0, len(game.trail))
+        depth = leaves[0].depth
+        self.assertTrue(all(leaf.depth == depth and not leaf.children for leaf in leaves))
+        # solution is in exactly one subproblem
+        solved = solution(cells)
+        matching = [leaf for leaf in leaves
+                    if all(solved[index] == num for index, num in enumerate(assign(game, leaf.path)) if num)]
+        self.assertEqual(1, len(matching))
+
+    def test_solution_cells_of_game_are_kept(self):
+        game = game_with_solution_cells(load_corpus('hard')[0], 8)
+        tree, leaves = split_game(game, 8)
+        self.assertEqual(8, len(game.trail))
+        for leaf in leaves:
+            board = assign(game, leaf.path)
+            self.assertTrue(all(board[index] == num for index, num in enumerate(game.board) if num))
+        with self.assertRaises(ValueError):
+            assign(game, [game.geometry.cell_ids[game.trail[0]] + '=1'])
+
+    def test_game_solved_by_propagation_is_not_split(self):
+        tree, leaves = split_game(Game(list(load_corpus('easy')[1])), 8)
+        self.assertEqual([None], leaves)
+        self.assertEqual(0, tree.size)
+
+    def test_unsolvable_game_has_no_leaves(self):
+        game = Game([Cell('a1', 1), Cell('b1', 2), Cell('c1', 3), Cell('d1', 4), Cell('e1', 5),
+                     Cell('f1', 6), Cell('g1', 7), Cell('h1', 8), Cell('i2', 9)])
+        self.assertEqual([], split_game(game, 8)[1])
+
+
+class ParallelSearchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.search = ParallelSearch(workers=2)
+
+    def tearDown(self):
+        self.search.close()
+
+    def test_solves_games_one_by_one(self):
+        for cells in load_corpus('hard')[:2] + load_corpus('minimal')[:1]:
+            game = Game(list(cells))
+            result = self.search.solve(game)
+            self.assertEqual(SOLVED, result.status)
+            self.assertEqual(solution(cells), result.board)
+            self.assertEqual(result.board, bytes(game.board))
+            self.assertFalse(self.search.cancelled.is_set())
+
+    def test_game_with_solution_cells(self):
+        for cells in load_corpus('hard')[:3]:
+            game = game_with_solution_cells(cells, 8)
+            result = self.search.solve(game)
+            self.assertEqual(SOLVED, result.status)
+            self.assertEqual(solution(cells), result.board)
+
+    def test_budget(self):
+        cells = load_corpus('hard')[0]
+        result = self.search.solve(Game(list(cells)), Budget(time_limit=0))
+        self.assertEqual((BUDGET_EXHAUSTED, 'time'), (result.status, result.reason))
+        game = Game([])
+        result = self.search.solve(game, Budget(max_nodes=0))
+        self.assertEqual((BUDGET_EXHAUSTED, 'nodes'), (result.status, result.reason))
+        self.assertEqual(0, game.filled_count)
+
+    def test_unsolvable(self):
+        result = self.search.solve(Game([Cell('a1', 1), Cell('a2', 1)]))
+        self.assertEqual((UNSOLVABLE, 'invalid'), (result.status, result.reason))
+        game = Game([Cell('a1', 1), Cell('b1', 2), Cell('c1', 3), Cell('d1', 4), Cell('e1', 5),
+                     Cell('f1', 6), Cell('g1', 7), Cell('h1', 8), Cell('i2', 9)])
+        self.assertEqual(UNSOLVABLE, self.search.solve(game).status)
+
+
+class SolveParallelTestCase(unittest.TestCase):
+
+    def test_solve_parallel_with_strategy(self):
+        cells = load_corpus('hard')[1]
+        game = Game(list(cells))
+        result = solve_parallel(game, workers=2, strategy='degree+lcv')
+        self.assertTrue(result.solved)
+        self.assertEqual(solution(cells), bytes(game.board))
+        self.assertGreater(result.metrics['subproblems'], 1)
@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from sudoku.task_readers import GameFileReader
+
+
+GAMES_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'zadani.txt')
+
+
+class GameFileReaderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'games.txt')
+        shutil.copy(GAMES_FILE, self.filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_iter_games_yields_all_games(self):
+        games = list(GameFileReader(self.filename).iter_games())
+        self.assertEqual([1, 2, 3], [index for index, _ in games])
+        self.assertEqual(30, len(games[0][1]))
+        self.assertEqual(('a1', 8), (games[0][1][0].id, games[0][1][0].num))
+
+    def test_get_game_is_same_as_iterated_game(self):
+        reader = GameFileReader(self.filename)
+        self.assertEqual(3, len(reader))
+        for index, text_block in reader.iter_text_blocks():
+            self.assertEqual(text_block, reader.get_text_block(index))
+        with self.assertRaises(KeyError):
+            reader.get_game(4)
+
+    def test_index_is_saved_and_used(self):
+        reader = GameFileReader(self.filename, use_index=True)
+        expected = reader.get_text_block(2)
+        self.assertTrue(os.path.exists(reader.index_filename))
+        other_reader = GameFileReader(self.filename, use_index=True)
+        self.assertEqual(list(reader.offsets), list(other_reader._load_index()))
+        self.assertEqual(expected, other_reader.get_text_block(2))
+
+    def test_out_of_date_index_is_rebuilt(self):
+        GameFileReader(self.filename, use_index=True).build_index()
+        with open(self.filename, 'a', encoding='utf-8') as file:
+            file.write('\n--------------\n1..|...|...\n')
+        reader = GameFileReader(self.filename, use_index=True)
+        self.assertIsNone(reader._load_index())
+        self.assertEqual(4, len(reader))
+        self.assertEqual(1, len(reader.get_game(4)))
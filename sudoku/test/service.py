@@ -0,0 +1,132 @@
+import asyncio
+import concurrent.futures
+import json
+import threading
+import unittest
+from unittest import mock
+
+from sudoku.service import SolveService, parse_puzzle, BadRequestException
+
+
+PUZZLE = '53..7....6..195....98....6.8...6...34..8.3..17...2...6.6....28....419..5....8..79'
+SOLUTION = '534678912672195348198342567859761423426853791713924856961537284287419635345286179'
+
+
+class ParsePuzzleTestCase(unittest.TestCase):
+
+    def test_parse_81_chars_and_text_block(self):
+        game = parse_puzzle(PUZZLE)
+        self.assertEqual(30, 81 - game.empty_count)
+        text_block = '\n'.join('|'.join(PUZZLE[row * 9 + col:row * 9 + col + 3] for col in (0, 3, 6))
+                               for row in range(9))
+        self.assertEqual(bytes(game.board), bytes(parse_puzzle(text_block).board))
+
+    def test_parse_unknown_characters(self):
+        with self.assertRaises(BadRequestException):
+            parse_puzzle('x' * 81)
+
+    def test_parse_incomplete_puzzle(self):
+        for text in ('', '53..7....', PUZZLE[:80], '53.|.7.|...\n6..|195|...'):
+            with self.assertRaises(BadRequestException):
+                parse_puzzle(text)
+
+
+class SolveServiceTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.service = SolveService(port=0, max_queue=4, timeout=5.0,
+                                    executor=concurrent.futures.ThreadPoolExecutor(2))
+        await self.service.start()
+
+    async def asyncTearDown(self):
+        await self.service.close()
+
+    async def request(self, method, path, body=None):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.service.port)
+        data = json.dumps(body).encode('utf-8') if body is not None else b''
+        writer.write('{} {} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {}\r\n\r\n'.format(
+            method, path, len(data)).encode('latin-1') + data)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        head, _, body = response.partition(b'\r\n\r\n')
+        return int(head.split()[1]), json.loads(body)
+
+    async def wait_for_solves(self):
+        for _ in range(100):
+            if not self.service.pending:
+                break
+            await asyncio.sleep(0.01)
+
+    async def test_solve(self):
+        status, response = await self.request('POST', '/solve', {'puzzle': PUZZLE})
+        self.assertEqual(200, status)
+        self.assertTrue(response['solved'])
+        self.assertEqual(SOLUTION, response['solution'])
+
+        status, stats = await self.request('GET', '/stats')
+        self.assertEqual(200, status)
+        self.assertEqual(1, stats['requests']['solved'])
+        self.assertEqual(0, stats['pending'])
+        self.assertIsNotNone(stats['p99_ms'])
+
+    async def test_bad_requests(self):
+        status, _ = await self.request('POST', '/solve', {'game': PUZZLE})
+        self.assertEqual(400, status)
+        status, response = await self.request('POST', '/solve', {'puzzle': '55' + PUZZLE[2:]})
+        self.assertEqual(400, status)
+        self.assertIn('a1', response['cells'])
+        status, _ = await self.request('GET', '/unknown')
+        self.assertEqual(404, status)
+
+    async def test_full_queue_is_rejected(self):
+        self.service.pending = self.service.max_queue
+        status, _ = await self.request('POST', '/solve', {'puzzle': PUZZLE})
+        self.assertEqual(503, status)
+        self.assertEqual(1, self.service.counters['rejected'])
+
+    async def test_deadline_exceeded(self):
+        self.service.timeout = 0
+        status, _ = await self.request('POST', '/solve', {'puzzle': PUZZLE})
+        self.assertEqual(504, status)
+        await self.wait_for_solves()
+        self.assertEqual(0, self.service.pending)
+
+    async def test_solve_after_deadline_is_pending_until_finished(self):
+        finished = threading.Event()
+
+        def slow_solve(board, engine, time_limit):
+            finished.wait(5)
+            return 'unsolvable', board
+
+        self.service.max_queue = 1
+        with mock.patch('sudoku.service._solve_board', slow_solve):
+            status, _ = await self.request('POST', '/solve', {'puzzle': PUZZLE, 'timeout': 0.05})
+            self.assertEqual(504, status)
+            self.assertEqual(1, self.service.pending)
+            status, _ = await self.request('POST', '/solve', {'puzzle': PUZZLE})
+            self.assertEqual(503, status)
+            finished.set()
+            await self.wait_for_solves()
+        self.assertEqual(0, self.service.pending)
+
+    async def test_failed_solve(self):
+        def failing_solve(board, engine, time_limit):
+            raise RuntimeError('worker failed')
+
+        with mock.patch('sudoku.service._solve_board', failing_solve):
+            status, response = await self.request('POST', '/solve', {'puzzle': PUZZLE})
+        self.assertEqual(500, status)
+        self.assertIn('RuntimeError', response['error'])
+        await self.wait_for_solves()
+        self.assertEqual(0, self.service.pending)
+
+        self.service.executor.shutdown()
+        status, _ = await self.request('POST', '/solve', {'puzzle': PUZZLE})
+        self.assertEqual(500, status)
+        self.assertEqual(0, self.service.pending)
+        self.assertEqual(2, self.service.counters['error'])
+
+    async def test_empty_puzzle(self):
+        status, _ = await self.request('POST', '/solve', {'puzzle': ''})
+        self.assertEqual(400, status)
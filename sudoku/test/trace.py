@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+from sudoku.benchmark import load_corpus
+from sudoku.engine_v2 import NumberSearchEngine
+from sudoku.structures import Game
+from sudoku.task_readers import TextBlockReader
+from sudoku.trace import TraceWriter, TraceReplayer
+
+
+GAME_1 = """
+    8..|94.|..5|
+    ...|.5.|2..|
+    1.9|6.2|...|
+    5.1|...|..4|
+    46.|...|.53|
+    2..|...|8.1|
+    ...|4.9|1.7|
+    ..4|.6.|...|
+    9..|.17|..6|
+    """
+
+
+class TraceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.filename = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def _assert_same_search(self, engine, replayer, solved=True):
+        tree, game = replayer.replay()
+        self.assertEqual(solved, replayer.solved)
+        self.assertEqual(engine.game.compressed(), game.compressed())
+        self.assertEqual(engine.game.get_formatted_solution_cells(), game.get_formatted_solution_cells())
+        expected = [(n.id, n.done) for n in engine.tree.walk_through_nodes_deep_first()]
+        self.assertEqual(expected, [(n.id, n.done) for n in tree.walk_through_nodes_deep_first()])
+        self.assertEqual(engine.tree.get_current().path, tree.get_current().path)
+
+    def test_replay_search_with_propagation(self):
+        engine = NumberSearchEngine(Game(TextBlockReader(GAME_1).get_game()), propagate_singles=True)
+        with TraceWriter(self.filename) as trace:
+            engine.trace = trace
+            self.assertTrue(engine.find_numbers())
+        self.assertGreater(engine.metrics.backtracks, 0)
+        self._assert_same_search(engine, TraceReplayer(self.filename))
+
+    def test_replay_search_stopped_at_dead_end(self):
+        engine = NumberSearchEngine(Game(TextBlockReader(GAME_1).get_game()))
+        with TraceWriter(self.filename) as trace:
+            engine.trace = trace
+            self.assertFalse(engine.find_numbers(False))
+        self._assert_same_search(engine, TraceReplayer(self.filename), solved=False)
+
+    def test_replay_search_with_compact_tree(self):
+        # searched subtrees are removed from tree of engine, replayed tree keeps them
+        for cells in load_corpus('hard') + load_corpus('minimal'):
+            engine = NumberSearchEngine(Game(cells), propagate_singles=True, compact_tree=True)
+            with TraceWriter(self.filename) as trace:
+                engine.trace = trace
+                self.assertTrue(engine.find_numbers())
+            replayer = TraceReplayer(self.filename)
+            tree, game = replayer.replay()
+            self.assertTrue(replayer.solved)
+            self.assertEqual(engine.game.get_formatted_solution_cells(), game.get_formatted_solution_cells())
+            current = engine.tree.get_current()
+            self.assertEqual(current.path if current else None,
+                             tree.get_current().path if tree.get_current() else None)
+
+    def test_replay_last_of_more_searches(self):
+        hard = load_corpus('hard')
+        with TraceWriter(self.filename) as trace:
+            for cells in hard[:2]:
+                engine = NumberSearchEngine(Game(cells), propagate_singles=True, trace=trace)
+                self.assertTrue(engine.find_numbers())
+        self._assert_same_search(engine, TraceReplayer(self.filename))
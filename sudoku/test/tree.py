@@ -142,6 +142,40 @@ A111 A112 A113 -
         self.assertEqual(','.join(n.id for n in all_nodes),
                          'A,B,C,|,A1,A2,-,-,|,A11,A12,-,|,A111,A112,A113,-,|,-,-,-,|')
 
+    def test_same_id_in_more_branches(self):
+        self.tree.add_node(Node('X'), 'A12')
+        self.tree.add_node(Node('X'), 'A2')
+        first = self.tree.find_by_path(('A', 'A1', 'A12', 'X'))
+        second = self.tree.find_by_path(('A', 'A2', 'X'))
+        self.assertIsNot(first, second)
+        self.assertEqual(('A', 'A2', 'X'), second.path)
+        self.assertEqual(2, second.depth)
+        self.assertIs(first, self.tree.exists_node(Node('X'), first.parent))
+        self.assertIsNone(self.tree.find_by_path(('A', 'X')))
+        self.tree.add_node(Node('Y'), second)
+        self.assertEqual(('A', 'A2', 'X', 'Y'), self.tree.find_in_nodes(self.tree.nodes, 'Y').path)
+
+    def test_set_current_marks_previous_current_node_done(self):
+        self.tree.set_current('A112')
+        node = self.tree.find_in_nodes(self.tree.nodes, 'A12')
+        self.tree.set_current(node)
+        self.assertIs(node, self.tree.get_current())
+        self.assertTrue(self.tree.find_in_nodes(self.tree.nodes, 'A112').done)
+        self.assertFalse(self.tree.find_in_nodes(self.tree.nodes, 'A112').current)
+
+    def test_remove_node_removes_subtree(self):
+        self.tree.set_current('A112')
+        node = self.tree.find_in_nodes(self.tree.nodes, 'A1')
+        self.tree.remove_node(node)
+        self.assertEqual('A,A2,B,C', ','.join(n.id for n in self.tree.walk_through_nodes_deep_first()))
+        self.assertIsNone(self.tree.find_in_nodes(self.tree.nodes, 'A112'))
+        self.assertIsNone(self.tree.find_by_path(('A', 'A1')))
+        self.assertIsNone(self.tree.get_current())
+        self.tree.remove_node(self.tree.find_in_nodes(self.tree.nodes, 'B'))
+        self.assertEqual('A,A2,C', ','.join(n.id for n in self.tree.walk_through_nodes_deep_first()))
+        self.tree.add_node(Node('A1'), 'A')
+        self.assertEqual(('A', 'A1'), self.tree.find_in_nodes(self.tree.nodes, 'A1').path)
+
     def _get_current_nodes_count(self):
         return len(list(n for n in self.tree.walk_through_nodes_deep_first() if n.current))
 
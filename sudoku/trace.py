@@ -0,0 +1,129 @@
+"""
+Recording of NumberSearchEngine search as stream of JSON lines (one event per line)
+and replaying of recorded search without computing of candidates.
+
+events:
+    {"e": "start", "game": "8..94...5..."}            input numbers, size * size symbols
+    {"e": "decision", "parent": 3, "choices": ["b1=2", "b1=7"], "selected": 0}
+    {"e": "propagation", "cells": ["c1=3", "f1=1"]}
+    {"e": "backtrack", "node": 5}
+    {"e": "end", "solved": true}
+
+nodes are numbered in order in which they appear in decision events (from 0),
+parent null means root level of tree
+"""
+import json
+import math
+
+from sudoku.status_tree import Tree, Node
+from sudoku.structures import Game, Cell, get_geometry
+
+
+class TraceWriter:
+
+    def __init__(self, filename, buffer_size=1 << 16):
+        self.file = open(filename, 'w', encoding='utf-8', buffering=buffer_size)
+        # count of numbered nodes, ids of nodes repeat in different branches so nodes get trace_key
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def _write(self, event):
+        self.file.write(json.dumps(event, separators=(',', ':')) + '\n')
+
+    def start(self, game):
+        self.count = 0
+        self._write({'e': 'start', 'game': ''.join(game.compressed())})
+
+    def decision(self, parent, children, selected):
+        for child in children:
+            child.trace_key = self.count
+            self.count += 1
+        self._write({'e': 'decision',
+                     'parent': parent.trace_key if parent else None,
+                     'choices': [child.id for child in children],
+                     'selected': children.index(selected)})
+
+    def propagation(self, cells):
+        self._write({'e': 'propagation', 'cells': [cell.id + '=' + str(cell.num) for cell in cells]})
+
+    def backtrack(self, node):
+        self._write({'e': 'backtrack', 'node': node.trace_key})
+
+    def end(self, solved):
+        self._write({'e': 'end', 'solved': solved})
+
+
+class TraceReplayer:
+    """rebuilds search tree and game from recorded trace"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.tree = Tree()
+        self.game = None
+        self.nodes = []
+        self.solved = None
+
+    def replay(self):
+        with open(self.filename, encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    self._apply(json.loads(line))
+        return self.tree, self.game
+
+    def _apply(self, event):
+        kind = event['e']
+        if kind == 'start':
+            # file can contain more searches, last one is replayed
+            self.tree = Tree()
+            self.nodes = []
+            game = event['game']
+            geometry = get_geometry(math.isqrt(len(game)))
+            self.game = Game.from_board([geometry.number(symbol) for symbol in game], geometry)
+        elif kind == 'decision':
+            parent = self.nodes[event['parent']] if event['parent'] is not None else None
+            if parent and parent.data is None:
+                parent.data = len(self.game.trail)
+            children = []
+            for choice in event['choices']:
+                node = Node(choice)
+                self.tree.add_node(node, parent)
+                children.append(node)
+            self.nodes.extend(children)
+            selected = children[event['selected']]
+            selected.done = True
+            self.tree.set_current(selected)
+            self._add(selected.id)
+        elif kind == 'propagation':
+            for cell in event['cells']:
+                self._add(cell)
+        elif kind == 'backtrack':
+            node = self.nodes[event['node']]
+            self.tree.get_current().done = True
+            self.game.undo(node.parent.data if node.parent else 0)
+            self._add(node.id)
+            self.tree.set_current(node)
+        elif kind == 'end':
+            self.solved = event['solved']
+
+    def _add(self, formatted_cell):
+        ident, num = formatted_cell.split('=')
+        self.game.add_cell(Cell(ident, int(num), self.game.geometry))
+
+
+if __name__ == "__main__":
+    import sys
+
+    replayer = TraceReplayer(sys.argv[1])
+    tree, game = replayer.replay()
+    print('solved: {}'.format(replayer.solved))
+    print('nodes: {}'.format(len(replayer.nodes)))
+    print('current: {}'.format('/'.join(tree.get_current().path) if tree.get_current() else None))
+    print('\n'.join(game.compressed()))
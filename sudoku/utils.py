@@ -22,6 +22,16 @@ class GameFormatter:
                     print("| ", end="")
         print("\n--------------------------------\n")
 
+    def text_block(self):
+        """game as text block readable by TextBlockReader"""
+        box = self.game.geometry.box
+        lines = []
+        for row, line in enumerate(self.game.compressed()):
+            if row and row % box == 0:
+                lines.append('')
+            lines.append('|'.join(line[col:col + box] for col in range(0, len(line), box)))
+        return '\n'.join(lines)
+
     def _statistics(self):
         d = {}
         filled = len([c for c in self.game.cells if c.num])